@@ -4,11 +4,20 @@ Test runner script for AWS Profile Switch.
 This script runs all tests and provides a summary of results.
 """
 
+import contextlib
+import importlib.util
+import io
+import os
 import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 
+# Modules that must be importable for the checks below to run
+DEV_MODULES = ("aws_profile_switch", "pytest", "pytest_cov", "xdist", "mypy", "ruff")
+
+
 def run_command(cmd, description):
     """Run a command and return the result."""
     print(f"\n{'='*60}")
@@ -29,6 +38,51 @@ def run_command(cmd, description):
         return False
 
 
+def run_check(description, func, args):
+    """Run one check in a worker process and return its captured output."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        try:
+            returncode = func(args)
+        except SystemExit as e:
+            returncode = e.code
+        except Exception as e:
+            print(f"Error running {description}: {e}")
+            returncode = 1
+    
+    return description, returncode, output.getvalue()
+
+
+def dev_dependencies_installed():
+    """Check whether the package and its dev tools are already importable."""
+    return all(importlib.util.find_spec(name) is not None for name in DEV_MODULES)
+
+
+def run_pytest(args):
+    """Run pytest in-process."""
+    import pytest
+    return pytest.main(args)
+
+
+def run_mypy(args):
+    """Run mypy through its Python API."""
+    from mypy import api
+    stdout, stderr, returncode = api.run(args)
+    print(stdout)
+    if stderr:
+        print("STDERR:", stderr)
+    return returncode
+
+
+def run_ruff(args):
+    """Run ruff, which ships as a native binary, in its own process."""
+    result = subprocess.run([sys.executable, "-m", "ruff", *args], capture_output=True, text=True)
+    print(result.stdout)
+    if result.stderr:
+        print("STDERR:", result.stderr)
+    return result.returncode
+
+
 def main():
     """Main test runner function."""
     # Change to the project directory
@@ -36,7 +90,6 @@ def main():
     original_dir = Path.cwd()
     
     try:
-        import os
         os.chdir(project_dir)
         
         print("AWS Profile Switch - Test Runner")
@@ -48,41 +101,46 @@ def main():
         print(f"Python executable: {sys.executable}")
         print(f"Python version: {sys.version}")
         
-        # Install dependencies in development mode
-        if not run_command([sys.executable, "-m", "pip", "install", "-e", ".[dev]"], 
-                          "Installing package in development mode"):
+        # Install dependencies in development mode (pip must run in its own process).
+        # Skip it when SKIP_INSTALL=1 or everything is already installed.
+        if os.environ.get("SKIP_INSTALL") == "1" or dev_dependencies_installed():
+            print("Development dependencies already installed, skipping install")
+        elif not run_command([sys.executable, "-m", "pip", "install", "-e", ".[dev]"],
+                            "Installing package in development mode"):
             print("Failed to install package")
             return False
         
-        # Run unit tests
-        if not run_command([sys.executable, "-m", "pytest", "tests/", "-v", "--tb=short"], 
-                          "Running unit tests"):
-            print("Unit tests failed")
-            return False
+        checks = [
+            # Unit tests with coverage in one run, spread across all cores;
+            # serial tests share a single worker
+            ("Running unit tests with coverage", run_pytest,
+             ["tests/", "-v", "--tb=short", "-n", "auto", "--dist", "loadgroup", "--cov=aws_profile_switch",
+              "--cov-report=term-missing", "--cov-report=html"]),
+            ("Running type checking", run_mypy, ["src/aws_profile_switch/"]),
+            ("Checking code formatting", run_ruff, ["format", "--check", "src/", "tests/"]),
+            ("Running linting", run_ruff, ["check", "src/", "tests/"]),
+        ]
         
-        # Run tests with coverage
-        if not run_command([sys.executable, "-m", "pytest", "tests/", "--cov=aws_profile_switch", 
-                           "--cov-report=term-missing", "--cov-report=html"], 
-                          "Running tests with coverage"):
-            print("Coverage tests failed")
-            return False
-        
-        # Run type checking with mypy
-        if not run_command([sys.executable, "-m", "mypy", "src/aws_profile_switch/"], 
-                          "Running type checking"):
-            print("Type checking failed")
-            return False
+        # The checks are independent, so run them side by side and report
+        # every failure once all of them have finished
+        with ProcessPoolExecutor(max_workers=len(checks)) as executor:
+            futures = [executor.submit(run_check, *check) for check in checks]
+            results = [future.result() for future in futures]
         
-        # Run code formatting check
-        if not run_command([sys.executable, "-m", "black", "--check", "src/", "tests/"], 
-                          "Checking code formatting"):
-            print("Code formatting check failed")
-            return False
+        failed = []
+        for description, returncode, output in results:
+            print(f"\n{'='*60}")
+            print(f"Running: {description}")
+            print(f"{'='*60}")
+            print(output)
+            if returncode:
+                print(f"ERROR: {description} failed with return code {returncode}")
+                failed.append(description)
         
-        # Run linting with flake8
-        if not run_command([sys.executable, "-m", "flake8", "src/", "tests/"], 
-                          "Running linting"):
-            print("Linting failed")
+        if failed:
+            print("\nFailed checks:")
+            for description in failed:
+                print(f"  - {description}")
             return False
         
         print("\n" + "=" * 60)
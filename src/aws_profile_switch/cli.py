@@ -11,9 +11,6 @@ def main() -> None:
     """Main entry point for the CLI application."""
     import argparse
     import os
-    import subprocess
-    import tempfile
-    import sys
     
     parser = argparse.ArgumentParser(description="AWS Profile Switcher")
     parser.add_argument("--exec", action="store_true", 
@@ -61,6 +58,8 @@ def main() -> None:
             shell_command = switcher.get_shell_command(selected_profile)
             
             if args.exec:
+                import tempfile
+                
                 # Generate a script to source
                 print(f"Setting AWS_PROFILE to: {selected_profile}", file=sys.stderr)
                 
@@ -84,6 +83,8 @@ def main() -> None:
                 print(f"source {temp_script}")
                 
             elif args.test:
+                import subprocess
+                
                 # Test the profile by running AWS CLI with it
                 print(f"Testing profile: {selected_profile}")
                 os.environ["AWS_PROFILE"] = selected_profile
@@ -1,91 +1,339 @@
 """AWS configuration file parser."""
 
-import configparser
+import io
 import os
+import pickle
+import sys
+from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, Optional, Set, TextIO, Tuple, Union
 
 from .exceptions import ConfigFileNotFoundError, ConfigParseError, InvalidProfileError
-from .models import SSOProfile
+from .models import SSOProfile, group_roles_by_account
+
+
+# Keys read from each profile section; everything else is skipped
+_PROFILE_KEYS = frozenset({
+    "sso_start_url",
+    "sso_account_id",
+    "sso_role_name",
+    "sso_region",
+    "sso_account_name",
+    "account_name",
+    "sso_auto_populated",
+})
+
+
+# Section name prefix of named profiles, e.g. "[profile dev]"
+_PROFILE_PREFIX = "profile "
+_PROFILE_PREFIX_LEN = len(_PROFILE_PREFIX)
+
+
+# Keys whose presence marks a profile as SSO-backed
+_SSO_REQUIRED = frozenset({"sso_start_url", "sso_account_id", "sso_role_name"})
+
+
+# Bumped whenever the pickled SSOProfile layout changes, so caches written
+# by an older version are ignored instead of unpickled into the new class
+_CACHE_FORMAT = 3
+
+
+# Profiles parsed in this process, keyed by (path, st_mtime_ns, st_size)
+_PARSE_CACHE: Dict[Tuple[str, int, int], List[SSOProfile]] = {}
+_PARSE_CACHE_SIZE = 8
+
+
+def _remember_parse(cache_key: Tuple[str, int, int], profiles: List[SSOProfile]) -> None:
+    """Store parsed profiles in the in-process cache, evicting the oldest entry."""
+    _PARSE_CACHE.pop(cache_key, None)
+    if len(_PARSE_CACHE) >= _PARSE_CACHE_SIZE:
+        del _PARSE_CACHE[next(iter(_PARSE_CACHE))]
+    _PARSE_CACHE[cache_key] = profiles
+
+
+class _UnsupportedSyntax(Exception):
+    """Raised by the fast reader for input that needs full configparser handling."""
 
 
 class AWSConfigParser:
-    """Parser for AWS configuration files."""
+    """Parser for AWS configuration files.
+    
+    Values are read literally: like the AWS CLI, no ``%`` interpolation is
+    applied, so a value such as ``50%`` is kept as written.
+    """
     
-    def __init__(self, config_file: Optional[Path] = None):
-        """Initialize the AWS config parser."""
-        self.config_file = config_file or Path.home() / ".aws" / "config"
+    def __init__(
+        self,
+        config_file: Optional[Union[Path, str, TextIO]] = None,
+        cache_file: Optional[Path] = None,
+    ):
+        """Initialize the AWS config parser.
+        
+        ``config_file`` is normally a path. It may also be the config content
+        itself, either as a string containing newlines or as a text stream;
+        such content is parsed in memory without touching the filesystem or
+        the profile cache.
+        """
+        self._content: Optional[str] = None
+        if isinstance(config_file, str) and "\n" in config_file:
+            self._content = config_file
+            config_file = None
+        elif config_file is not None and not isinstance(config_file, (str, Path)):
+            self._content = config_file.read()
+            config_file = None
+        
+        self.config_file = Path(config_file) if config_file else Path.home() / ".aws" / "config"
+        self.cache_file = cache_file or Path.home() / ".aws" / ".profile_switch_cache.pkl"
         self.profiles: List[SSOProfile] = []
+        self.unique_account_names: Tuple[str, ...] = ()
+        self.unique_roles_per_account: Dict[str, Tuple[str, ...]] = {}
+        self.profiles_by_account_role: Dict[Tuple[str, str], List[SSOProfile]] = {}
+        self._by_name: Dict[str, SSOProfile] = {}
     
-    def _is_sso_profile(self, section: configparser.SectionProxy) -> bool:
+    def _build_indexes(self) -> None:
+        """Build name, account and account/role lookup indexes over the parsed profiles."""
+        by_account_role: Dict[Tuple[str, str], List[SSOProfile]] = defaultdict(list)
+        by_name: Dict[str, SSOProfile] = {}
+        
+        for profile in self.profiles:
+            by_name.setdefault(profile.profile_name, profile)
+            by_account_role[(profile.sso_account_name, profile.sso_role_name)].append(profile)
+        
+        self.unique_roles_per_account = group_roles_by_account(self.profiles)
+        self.unique_account_names = tuple(self.unique_roles_per_account)
+        self.profiles_by_account_role = dict(by_account_role)
+        self._by_name = by_name
+    
+    def _file_digest(self) -> bytes:
+        """Hash the config file's content."""
+        # Only needed when the file's stat no longer matches the cache
+        import hashlib
+        
+        return hashlib.blake2b(self.config_file.read_bytes(), digest_size=16).digest()
+    
+    def _load_cache(self, cache_key: Tuple[str, int, int]) -> Optional[List[SSOProfile]]:
+        """Load cached profiles if they were parsed from the same file content."""
+        try:
+            with open(self.cache_file, "rb") as f:
+                # The header is pickled first so a stale cache is rejected
+                # without unpickling the profiles
+                cache_format, cached_key, digest = pickle.load(f)
+                if cache_format != _CACHE_FORMAT:
+                    return None
+                # A new mtime alone (a touch, a checkout) does not mean the
+                # content changed, so fall back to comparing content hashes
+                key_matches = cached_key == cache_key
+                if not key_matches and digest != self._file_digest():
+                    return None
+                profiles = pickle.load(f)
+        except Exception:
+            return None
+        
+        if not isinstance(profiles, list):
+            return None
+        if not key_matches:
+            # Record the new file state so the next run matches on stat alone;
+            # _save_cache swaps in a uniquely named temp file, so this is safe
+            # while another process is doing the same
+            self._save_cache(cache_key, profiles, digest)
+        return profiles
+    
+    def _save_cache(
+        self,
+        cache_key: Tuple[str, int, int],
+        profiles: List[SSOProfile],
+        digest: Optional[bytes] = None,
+    ) -> None:
+        """Save parsed profiles together with the file state and content hash they came from."""
+        # Only needed on a cache miss
+        import tempfile
+        
+        tmp_name = None
+        try:
+            if digest is None:
+                digest = self._file_digest()
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # Write a uniquely named sibling and swap it in, so concurrent
+            # writers never share a temp file and readers never see a torn one
+            with tempfile.NamedTemporaryFile(
+                "wb", dir=self.cache_file.parent, prefix=self.cache_file.name + ".",
+                suffix=".tmp", delete=False,
+            ) as f:
+                tmp_name = f.name
+                pickle.dump((_CACHE_FORMAT, cache_key, digest), f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(profiles, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, self.cache_file)
+        except Exception:
+            # Silently fail if we can't save the cache, but don't leave the
+            # temp file behind
+            if tmp_name is not None:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+    
+    def _is_sso_profile(self, section: Mapping[str, str]) -> bool:
         """Check if a configuration section represents an SSO profile."""
         # Check for explicit SSO auto-populated flag
-        if section.get("sso_auto_populated", "").lower() == "true":
+        auto_populated = section.get("sso_auto_populated")
+        if auto_populated and auto_populated.lower() == "true":
             return True
         
         # Check for presence of required SSO fields
-        sso_fields = [
-            "sso_start_url",
-            "sso_account_id",
-            "sso_role_name"
-        ]
-        
-        return all(field in section for field in sso_fields)
+        return _SSO_REQUIRED.issubset(section.keys())
     
-    def _extract_sso_profile(self, profile_name: str, section: configparser.SectionProxy) -> SSOProfile:
+    def _extract_sso_profile(self, profile_name: str, section: Mapping[str, str]) -> SSOProfile:
         """Extract SSO profile information from a configuration section."""
+        # Bind the lookup once; it runs for every field of every profile
+        get = section.get
         try:
             # Extract required fields
-            sso_start_url = section.get("sso_start_url")
-            sso_account_id = section.get("sso_account_id")
-            sso_role_name = section.get("sso_role_name")
+            sso_start_url = get("sso_start_url")
+            sso_account_id = get("sso_account_id")
+            sso_role_name = get("sso_role_name")
             
-            # Extract optional fields
-            sso_region = section.get("sso_region")
+            # Validate required fields
+            if not (sso_start_url and sso_account_id and sso_role_name):
+                raise InvalidProfileError(f"Profile '{profile_name}' missing required SSO fields")
             
             # For account name, try multiple sources
             sso_account_name = (
-                section.get("sso_account_name") or
-                section.get("account_name") or
+                get("sso_account_name") or
+                get("account_name") or
                 f"Account-{sso_account_id}"
             )
             
-            # Validate required fields
-            if not all([sso_start_url, sso_account_id, sso_role_name]):
-                raise InvalidProfileError(f"Profile '{profile_name}' missing required SSO fields")
+            # Start URLs, regions, account IDs, account names and role names
+            # repeat across profiles, so intern them: every profile then
+            # shares one string object per value, whichever reader produced
+            # it, and comparisons against them short-circuit on identity
+            intern = sys.intern
+            sso_region = get("sso_region")
             
+            # Positional arguments, in SSOProfile field order
             return SSOProfile(
-                profile_name=profile_name,
-                sso_account_name=sso_account_name,
-                sso_account_id=sso_account_id,
-                sso_role_name=sso_role_name,
-                sso_start_url=sso_start_url,
-                sso_region=sso_region
+                profile_name,
+                intern(sso_account_name),
+                intern(sso_account_id),
+                intern(sso_role_name),
+                intern(sso_start_url),
+                intern(sso_region) if sso_region is not None else None,
             )
             
         except (ValueError, InvalidProfileError) as e:
             raise InvalidProfileError(f"Invalid SSO profile '{profile_name}': {e}")
     
-    def parse_config(self) -> List[SSOProfile]:
-        """Parse the AWS config file and extract SSO profiles."""
-        if not self.config_file.exists():
-            raise ConfigFileNotFoundError(f"AWS config file not found: {self.config_file}")
+    def _open(self) -> TextIO:
+        """Open the config source for reading as text."""
+        if self._content is not None:
+            return io.StringIO(self._content)
+        return open(self.config_file, "r", buffering=65536)
+    
+    def _read_profile_sections(self) -> List[Tuple[str, Mapping[str, str]]]:
+        """Read ``[profile ...]`` sections in a single pass over the file.
+        
+        Only the keys in ``_PROFILE_KEYS`` are kept. Anything this reader does
+        not handle the same way configparser would (indented keys,
+        continuation lines on a kept key, duplicates, malformed lines) raises
+        ``_UnsupportedSyntax`` so the caller can fall back to configparser.
+        """
+        sections: List[Tuple[str, Mapping[str, str]]] = []
+        seen_sections = set()
+        # Every key of the current section, kept or not, since configparser
+        # rejects any repeated option
+        section_keys: Set[str] = set()
+        current: Optional[Dict[str, str]] = None
+        in_section = False
+        last_key_dropped = False
+        
+        with self._open() as f:
+            for line in f:
+                stripped = line.strip()
+                if not stripped or stripped[0] in "#;":
+                    continue
+                
+                if line[0] in " \t":
+                    # An indented line continues the previous key's value, or
+                    # is itself a key when nothing precedes it; only the
+                    # continuation of a skipped key can safely be ignored
+                    if not last_key_dropped:
+                        raise _UnsupportedSyntax(stripped)
+                    continue
+                
+                if stripped[0] == "[":
+                    if stripped[-1] != "]" or stripped == "[DEFAULT]":
+                        raise _UnsupportedSyntax(stripped)
+                    section_name = stripped[1:-1]
+                    if section_name in seen_sections:
+                        raise _UnsupportedSyntax(stripped)
+                    seen_sections.add(section_name)
+                    section_keys = set()
+                    in_section = True
+                    last_key_dropped = False
+                    
+                    # Skip non-profile sections
+                    if section_name.startswith(_PROFILE_PREFIX):
+                        current = {}
+                        sections.append((section_name[_PROFILE_PREFIX_LEN:], current))
+                    else:
+                        current = None
+                    continue
+                
+                if not in_section:
+                    raise _UnsupportedSyntax(stripped)
+                
+                # Options are split on the first "=" or ":", as configparser does
+                eq = stripped.find("=")
+                colon = stripped.find(":")
+                if eq < 0 or (0 <= colon < eq):
+                    eq = colon
+                if eq <= 0:
+                    raise _UnsupportedSyntax(stripped)
+                
+                key = stripped[:eq].rstrip().lower()
+                if key in section_keys:
+                    raise _UnsupportedSyntax(stripped)
+                section_keys.add(key)
+                last_key_dropped = True
+                if current is not None and key in _PROFILE_KEYS:
+                    current[key] = stripped[eq + 1:].lstrip()
+                    last_key_dropped = False
+        
+        return sections
+    
+    def _read_profile_sections_configparser(self) -> List[Tuple[str, Mapping[str, str]]]:
+        """Read ``[profile ...]`` sections using the full configparser implementation."""
+        # Most configs never reach this fallback, so keep configparser out
+        # of the import path
+        import configparser
+        
+        # RawConfigParser skips interpolation, which AWS configs never use
+        config = configparser.RawConfigParser()
+        try:
+            if self._content is not None:
+                config.read_string(self._content)
+            else:
+                config.read(self.config_file)
+        except configparser.Error as e:
+            raise ConfigParseError(f"Failed to parse AWS config file: {e}")
         
+        return [
+            (section_name[_PROFILE_PREFIX_LEN:], config[section_name])
+            for section_name in config.sections()
+            if section_name.startswith(_PROFILE_PREFIX)
+        ]
+    
+    def _parse_profiles(self) -> List[SSOProfile]:
+        """Read the config source and build its SSO profiles."""
         try:
-            config = configparser.ConfigParser()
-            config.read(self.config_file)
+            try:
+                sections = self._read_profile_sections()
+            except _UnsupportedSyntax:
+                sections = self._read_profile_sections_configparser()
             
             profiles = []
             
-            for section_name in config.sections():
-                # Skip non-profile sections
-                if not section_name.startswith("profile "):
-                    continue
-                
-                # Extract profile name (remove "profile " prefix)
-                profile_name = section_name[8:]  # len("profile ") = 8
-                section = config[section_name]
-                
+            for profile_name, section in sections:
                 # Check if this is an SSO profile
                 if self._is_sso_profile(section):
                     try:
@@ -95,41 +343,66 @@ class AWSConfigParser:
                         # Skip invalid profiles but continue processing
                         continue
             
-            self.profiles = profiles
             return profiles
             
-        except configparser.Error as e:
-            raise ConfigParseError(f"Failed to parse AWS config file: {e}")
+        except ConfigParseError:
+            raise
         except Exception as e:
             raise ConfigParseError(f"Unexpected error parsing config file: {e}")
     
+    def parse_config(self) -> List[SSOProfile]:
+        """Parse the AWS config file and extract SSO profiles."""
+        if self._content is not None:
+            # In-memory content has no file state to cache against
+            self.profiles = self._parse_profiles()
+            self._build_indexes()
+            return self.profiles
+        
+        if not self.config_file.exists():
+            raise ConfigFileNotFoundError(f"AWS config file not found: {self.config_file}")
+        
+        # The config rarely changes, so reuse the last parse while the file's
+        # path, modification time and size are unchanged: first from this
+        # process, then from the on-disk cache, which also accepts an
+        # unchanged content hash
+        try:
+            stat = self.config_file.stat()
+        except OSError as e:
+            raise ConfigParseError(f"Failed to read AWS config file: {e}")
+        cache_key = (str(self.config_file.resolve()), stat.st_mtime_ns, stat.st_size)
+        cached_profiles = _PARSE_CACHE.get(cache_key)
+        if cached_profiles is None:
+            cached_profiles = self._load_cache(cache_key)
+            if cached_profiles is not None:
+                _remember_parse(cache_key, cached_profiles)
+        if cached_profiles is not None:
+            self.profiles = list(cached_profiles)
+            self._build_indexes()
+            return self.profiles
+        
+        profiles = self._parse_profiles()
+        self.profiles = profiles
+        self._build_indexes()
+        _remember_parse(cache_key, list(profiles))
+        self._save_cache(cache_key, profiles)
+        return profiles
+    
     def get_profiles(self) -> List[SSOProfile]:
         """Get the list of parsed SSO profiles."""
         return self.profiles
     
     def get_profile_by_name(self, profile_name: str) -> Optional[SSOProfile]:
         """Get a specific profile by name."""
-        for profile in self.profiles:
-            if profile.profile_name == profile_name:
-                return profile
-        return None
-    
-    def get_accounts(self) -> List[str]:
-        """Get a list of unique account names."""
-        return sorted(list(set(profile.sso_account_name for profile in self.profiles)))
-    
-    def get_roles_for_account(self, account_name: str) -> List[str]:
-        """Get a list of roles for a specific account."""
-        roles = [
-            profile.sso_role_name
-            for profile in self.profiles
-            if profile.sso_account_name == account_name
-        ]
-        return sorted(list(set(roles)))
+        return self._by_name.get(profile_name)
+    
+    def get_accounts(self) -> Tuple[str, ...]:
+        """Get the sorted unique account names."""
+        return self.unique_account_names
+    
+    def get_roles_for_account(self, account_name: str) -> Tuple[str, ...]:
+        """Get the sorted roles for a specific account."""
+        return self.unique_roles_per_account.get(account_name, ())
     
     def get_profiles_for_account_and_role(self, account_name: str, role_name: str) -> List[SSOProfile]:
         """Get profiles matching a specific account and role."""
-        return [
-            profile for profile in self.profiles
-            if profile.sso_account_name == account_name and profile.sso_role_name == role_name
-        ]
\ No newline at end of file
+        return list(self.profiles_by_account_role.get((account_name, role_name), ()))
\ No newline at end of file
@@ -1,28 +1,44 @@
 """Core functionality for AWS Profile Switch."""
 
-from typing import Optional
+import functools
+from typing import Optional, TextIO, Union
 from pathlib import Path
 
 from .config_parser import AWSConfigParser
 from .exceptions import AWSProfileSwitchError, NoSSOProfilesFoundError
 from .models import ProfileHistory
-from .ui import ProfileSelector
 from .shell import ShellDetector
 
 
 class AWSProfileSwitcher:
     """Main class that orchestrates the profile switching workflow."""
     
-    def __init__(self, config_file: Optional[Path] = None):
-        """Initialize the AWS Profile Switcher."""
+    def __init__(self, config_file: Optional[Union[Path, TextIO]] = None):
+        """Initialize the AWS Profile Switcher.
+        
+        ``config_file`` may also be a text stream holding the config content.
+        """
         self.config_parser = AWSConfigParser(config_file)
-        self.history = ProfileHistory()
-        self.shell_detector = ShellDetector()
         self.profiles = []
         self.selector = None
+        self._loaded = False
+    
+    @functools.cached_property
+    def history(self) -> ProfileHistory:
+        """Profile history, loaded on first use."""
+        return ProfileHistory()
+    
+    @functools.cached_property
+    def shell_detector(self) -> ShellDetector:
+        """Shell detector, created on first use."""
+        return ShellDetector()
     
     def _load_profiles(self) -> None:
         """Load and parse AWS profiles from the config file."""
+        # Every workflow step shares the first successful load
+        if self._loaded:
+            return
+        
         self.profiles = self.config_parser.parse_config()
         
         if not self.profiles:
@@ -31,7 +47,17 @@ class AWSProfileSwitcher:
                 "Please ensure you have SSO profiles configured."
             )
         
-        self.selector = ProfileSelector(self.profiles)
+        # The UI pulls in prompt_toolkit and rapidfuzz, so only import it once
+        # an interactive selection is actually needed
+        from .ui import ProfileSelector
+        
+        self.selector = ProfileSelector(
+            self.profiles,
+            account_names=self.config_parser.unique_account_names,
+            roles_by_account=self.config_parser.unique_roles_per_account,
+            profiles_by_account_role=self.config_parser.profiles_by_account_role,
+        )
+        self._loaded = True
     
     def run(self) -> Optional[str]:
         """Run the interactive profile selection workflow."""
@@ -82,8 +108,7 @@ class AWSProfileSwitcher:
     
     def list_profiles(self) -> list:
         """List all available SSO profiles."""
-        if not self.profiles:
-            self._load_profiles()
+        self._load_profiles()
         
         return [
             {
@@ -1,12 +1,26 @@
 """Data models for AWS Profile Switch."""
 
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 import json
+import os
+import sys
 from pathlib import Path
 
 
-@dataclass
+# Slotted dataclasses drop the per-instance __dict__; they need Python 3.10+
+_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+# Number of recently used profiles kept in the history
+_HISTORY_SIZE = 10
+
+
+# Profiles are immutable, so they hash by value and can be shared freely
+# between the parser cache, its indexes and the selectors
+@dataclass(frozen=True, **_SLOTS)
 class SSOProfile:
     """Represents an AWS SSO profile."""
     
@@ -57,55 +71,129 @@ class SSOProfile:
         )
 
 
+def group_roles_by_account(profiles: Iterable[SSOProfile]) -> Dict[str, Tuple[str, ...]]:
+    """Map each account name to its sorted, unique role names.
+    
+    Accounts are inserted in sorted order, so ``tuple(result)`` is the sorted
+    account list. Every index of account and role names is built from this,
+    so searches rank ties the same way whoever built them.
+    """
+    roles: Dict[str, Set[str]] = {}
+    for profile in profiles:
+        roles.setdefault(profile.sso_account_name, set()).add(profile.sso_role_name)
+    return {account: tuple(sorted(roles[account])) for account in sorted(roles)}
+
+
 class ProfileHistory:
     """Manages the history of recently used profiles."""
     
-    def __init__(self, history_file: Optional[Path] = None):
-        """Initialize the profile history manager."""
+    def __init__(
+        self,
+        history_file: Optional[Path] = None,
+        in_memory: bool = False,
+        flush_on_add: bool = True,
+    ):
+        """Initialize the profile history manager.
+        
+        With ``in_memory`` the history starts empty and is never read from or
+        written to ``history_file``. With ``flush_on_add`` off, changes are
+        only written by ``flush()`` or on leaving a ``with`` block.
+        """
         self.history_file = history_file or Path.home() / ".aws" / "profile_switch_history.json"
-        self._history: List[str] = []
+        self._in_memory = in_memory
+        self._flush_on_add = flush_on_add
+        # Profile names from oldest to most recent, so re-adding one is a
+        # move to the end instead of a list scan and shift
+        self._history: "OrderedDict[str, None]" = OrderedDict()
+        # What the history file is known to contain, to skip no-op writes
+        self._saved: Optional[Tuple[Path, Tuple[str, ...]]] = None
         self._load_history()
     
+    def __enter__(self) -> "ProfileHistory":
+        """Defer writes until the block exits."""
+        self._deferred_flush_on_add = self._flush_on_add
+        self._flush_on_add = False
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        """Write any changes made inside the block."""
+        self._flush_on_add = self._deferred_flush_on_add
+        self.flush()
+    
     def _load_history(self) -> None:
         """Load history from the JSON file."""
+        if self._in_memory:
+            return
         try:
-            if self.history_file.exists():
-                with open(self.history_file, 'r') as f:
-                    data = json.load(f)
-                    self._history = data.get("recent_profiles", [])
-        except (json.JSONDecodeError, FileNotFoundError, KeyError):
-            self._history = []
+            # json.loads detects the encoding itself, so skip the text decode
+            data = json.loads(self.history_file.read_bytes())
+            # The file lists the most recent profile first
+            recent = data.get("recent_profiles", [])[:_HISTORY_SIZE]
+            self._history = OrderedDict.fromkeys(reversed(recent))
+            self._saved = (self.history_file, tuple(recent))
+        except (ValueError, OSError, AttributeError, TypeError):
+            # ValueError covers both malformed JSON and undecodable bytes
+            self._history = OrderedDict()
     
     def _save_history(self) -> None:
         """Save history to the JSON file."""
+        if self._in_memory:
+            return
+        recent = self.get_recent_profiles(_HISTORY_SIZE)
+        state = (self.history_file, tuple(recent))
+        if state == self._saved:
+            # Re-selecting the most recent profile leaves the file unchanged
+            return
+        # Only needed when the history actually changes
+        import tempfile
+        
+        tmp_name = None
         try:
             self.history_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.history_file, 'w') as f:
-                json.dump({"recent_profiles": self._history}, f, indent=2)
+            # Write a uniquely named sibling temp file and swap it in, so
+            # readers never see a partially written history and concurrent
+            # writers never share a temp file
+            with tempfile.NamedTemporaryFile(
+                "w", dir=self.history_file.parent, prefix=self.history_file.name + ".",
+                suffix=".tmp", delete=False,
+            ) as f:
+                tmp_name = f.name
+                f.write(json.dumps({"recent_profiles": recent}, separators=(",", ":")))
+            os.replace(tmp_name, self.history_file)
+            self._saved = state
         except Exception:
-            # Silently fail if we can't save history
-            pass
+            # Silently fail if we can't save history, but don't leave the
+            # temp file behind
+            if tmp_name is not None:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
     
     def add_profile(self, profile_name: str) -> None:
         """Add a profile to the history."""
-        # Remove the profile if it already exists
-        if profile_name in self._history:
-            self._history.remove(profile_name)
-        
-        # Add to the beginning of the list
-        self._history.insert(0, profile_name)
+        # Add as the most recent entry, moving it if it already exists
+        self._history[profile_name] = None
+        self._history.move_to_end(profile_name)
         
         # Keep only the last 10 profiles
-        self._history = self._history[:10]
+        while len(self._history) > _HISTORY_SIZE:
+            self._history.popitem(last=False)
         
         # Save the updated history
+        if self._flush_on_add:
+            self._save_history()
+    
+    def flush(self) -> None:
+        """Write pending changes to the history file."""
         self._save_history()
     
     def get_recent_profiles(self, limit: int = 5) -> List[str]:
         """Get the most recently used profiles."""
-        return self._history[:limit]
+        return list(islice(reversed(self._history), limit))
     
     def clear(self) -> None:
         """Clear all history."""
-        self._history = []
-        self._save_history()
\ No newline at end of file
+        self._history = OrderedDict()
+        if self._flush_on_add:
+            self._save_history()
\ No newline at end of file
@@ -1,36 +1,126 @@
 """Fuzzy search functionality for AWS profiles."""
 
-from typing import List, Tuple
-from fuzzywuzzy import fuzz, process
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
 
-from .models import SSOProfile
+from .models import SSOProfile, group_roles_by_account
+
+
+# Search results kept per searcher, oldest evicted first
+_SEARCH_CACHE_SIZE = 512
 
 
 class FuzzySearcher:
     """Provides fuzzy search capabilities for AWS profiles."""
     
-    def __init__(self, profiles: List[SSOProfile]):
-        """Initialize the fuzzy searcher with a list of profiles."""
+    def __init__(
+        self,
+        profiles: List[SSOProfile],
+        account_names: Optional[Tuple[str, ...]] = None,
+        roles_by_account: Optional[Dict[str, Tuple[str, ...]]] = None,
+    ):
+        """Initialize the fuzzy searcher with a list of profiles.
+        
+        ``account_names`` and ``roles_by_account`` may be passed in when the
+        caller already holds them (see ``AWSConfigParser.unique_account_names``
+        and ``AWSConfigParser.unique_roles_per_account``), so account and role
+        searches only ever touch plain string tuples.
+        """
         self.profiles = profiles
+        
+        # Search corpora are fixed for the lifetime of the searcher, so build
+        # them once here rather than on every keystroke
+        if roles_by_account is None:
+            roles_by_account = group_roles_by_account(profiles)
+        if account_names is None:
+            account_names = tuple(roles_by_account)
+        
+        self._account_names: Tuple[str, ...] = account_names
+        self._roles_by_account: Dict[str, Tuple[str, ...]] = roles_by_account
+        # Casefolded copies for substring checks, and copies already run
+        # through default_process so rapidfuzz only has to process the query
+        self._account_names_lower = tuple(name.casefold() for name in account_names)
+        self._account_names_processed = tuple(default_process(name) for name in account_names)
+        self._roles_lower_by_account = {
+            account: tuple(role.casefold() for role in roles)
+            for account, roles in roles_by_account.items()
+        }
+        self._roles_processed_by_account = {
+            account: tuple(default_process(role) for role in roles)
+            for account, roles in roles_by_account.items()
+        }
+        self._profile_refs: List[SSOProfile] = list(profiles)
+        self._profile_search_strings: List[str] = [
+            default_process(f"{p.sso_account_name} {p.sso_role_name} {p.profile_name}")
+            for p in self._profile_refs
+        ]
+        
+        # The corpora never change, so results depend only on the arguments
+        self._cache: Dict[Tuple[Any, ...], List[Any]] = {}
+    
+    def _cached(self, key: Tuple[Any, ...], compute: Callable[[], List[Any]]) -> List[Any]:
+        """Return a copy of the cached result for ``key``, computing it on a miss."""
+        result = self._cache.get(key)
+        if result is None:
+            result = compute()
+            if len(self._cache) >= _SEARCH_CACHE_SIZE:
+                del self._cache[next(iter(self._cache))]
+            self._cache[key] = result
+        return list(result)
+    
+    def _search_names(
+        self,
+        query: str,
+        names: Tuple[str, ...],
+        names_lower: Tuple[str, ...],
+        names_processed: Tuple[str, ...],
+        limit: int,
+    ) -> List[str]:
+        """Search names, returning substring hits before fuzzy matches."""
+        # Plain substring matches are cheap and usually what the user means,
+        # so collect them first and only score fuzzily when they run short
+        query_lower = query.strip().casefold()
+        result = [name for name, lower in zip(names, names_lower) if query_lower in lower]
+        if len(result) >= limit or len(query_lower) <= 2:
+            return result[:limit]
+        
+        # Perform fuzzy search over the preprocessed names
+        matches = process.extract(
+            default_process(query),
+            names_processed,
+            scorer=fuzz.WRatio,
+            processor=None,
+            limit=limit,
+            score_cutoff=30,  # Minimum 30% match
+        )
+        
+        # Append fuzzy matches sorted by match score (descending)
+        seen = set(result)
+        for _, _, index in matches:
+            if len(result) >= limit:
+                break
+            name = names[index]
+            if name not in seen:
+                result.append(name)
+        
+        return result
     
     def search_accounts(self, query: str, limit: int = 10) -> List[str]:
         """Search for account names matching the query."""
         if not query.strip():
             return []
         
-        # Get unique account names
-        account_names = list(set(profile.sso_account_name for profile in self.profiles))
-        
-        # Perform fuzzy search
-        matches = process.extract(
-            query,
-            account_names,
-            scorer=fuzz.WRatio,
-            limit=limit
+        return self._cached(
+            ("accounts", query, limit),
+            lambda: self._search_names(
+                query,
+                self._account_names,
+                self._account_names_lower,
+                self._account_names_processed,
+                limit,
+            ),
         )
-        
-        # Return account names sorted by match score (descending)
-        return [match[0] for match in matches if match[1] > 30]  # Minimum 30% match
     
     def search_roles(self, query: str, account_name: str, limit: int = 10) -> List[str]:
         """Search for role names matching the query within a specific account."""
@@ -38,64 +128,88 @@ class FuzzySearcher:
             return []
         
         # Get roles for the specific account
-        roles = [
-            profile.sso_role_name
-            for profile in self.profiles
-            if profile.sso_account_name == account_name
-        ]
-        
-        # Remove duplicates
-        unique_roles = list(set(roles))
+        unique_roles = self._roles_by_account.get(account_name)
+        if not unique_roles:
+            return []
         
-        # Perform fuzzy search
-        matches = process.extract(
-            query,
-            unique_roles,
-            scorer=fuzz.WRatio,
-            limit=limit
+        return self._cached(
+            ("roles", query, account_name, limit),
+            lambda: self._search_names(
+                query,
+                unique_roles,
+                self._roles_lower_by_account[account_name],
+                self._roles_processed_by_account[account_name],
+                limit,
+            ),
         )
-        
-        # Return role names sorted by match score (descending)
-        return [match[0] for match in matches if match[1] > 30]  # Minimum 30% match
     
     def search_profiles(self, query: str, limit: int = 10) -> List[SSOProfile]:
         """Search for profiles matching the query across all fields."""
         if not query.strip():
             return []
         
-        # Create searchable strings for each profile
-        profile_strings = []
-        for profile in self.profiles:
-            search_string = f"{profile.sso_account_name} {profile.sso_role_name} {profile.profile_name}"
-            profile_strings.append(search_string)
+        return self._cached(("profiles", query, limit), lambda: self._search_profiles(query, limit))
+    
+    def _search_profiles(self, query: str, limit: int) -> List[SSOProfile]:
+        """Fuzzy search the profile search strings."""
+        # Perform fuzzy search over the preprocessed search strings
+        matches = process.extract(
+            default_process(query),
+            self._profile_search_strings,
+            scorer=fuzz.WRatio,
+            processor=None,
+            limit=limit,
+            score_cutoff=30,  # Minimum 30% match
+        )
         
-        # Perform fuzzy search
+        # Return profiles sorted by match score (descending), using the
+        # index rapidfuzz reports for each match
+        return [self._profile_refs[index] for _, _, index in matches]
+    
+    def get_matches(
+        self, query: str, candidates: Sequence[str], limit: int = 5
+    ) -> List[Tuple[str, int]]:
+        """Get the best matching candidates for a query with their scores."""
+        if not query.strip() or not candidates:
+            return []
+        
+        # One extract call ranks every candidate, so callers that need both
+        # the best match and the runners-up don't score the list twice
         matches = process.extract(
             query,
-            profile_strings,
+            candidates,
             scorer=fuzz.WRatio,
-            limit=limit
+            processor=default_process,
+            limit=limit,
+            score_cutoff=30,  # Minimum 30% match
         )
         
-        # Return profiles sorted by match score (descending)
-        result = []
-        for match in matches:
-            if match[1] > 30:  # Minimum 30% match
-                # Find the original profile by index
-                index = profile_strings.index(match[0])
-                result.append(self.profiles[index])
-        
-        return result
+        return [(name, round(score)) for name, score, _ in matches]
     
     def get_best_match(self, query: str, candidates: List[str]) -> Tuple[str, int]:
         """Get the best matching candidate for a query."""
         if not query.strip() or not candidates:
             return "", 0
         
+        # A candidate equal to the query ignoring case is taken as a perfect
+        # match without running the scorer. Case is folded as elsewhere in
+        # the searcher; this is not default_process, which also strips
+        # punctuation, so other candidates WRatio scores 100 still go
+        # through extractOne below
+        query_folded = query.casefold()
+        for candidate in candidates:
+            if candidate.casefold() == query_folded:
+                return candidate, 100
+        
         match = process.extractOne(
             query,
             candidates,
-            scorer=fuzz.WRatio
+            scorer=fuzz.WRatio,
+            processor=default_process,
+            score_cutoff=30,  # Minimum 30% match
         )
         
-        return match if match else ("", 0)
\ No newline at end of file
+        if not match:
+            return "", 0
+        
+        return match[0], round(match[1])
\ No newline at end of file
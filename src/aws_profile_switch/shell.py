@@ -1,37 +1,87 @@
 """Shell environment detection and command generation."""
 
+import functools
 import os
 import platform
 from typing import Optional
 
 
+# Shell type for each known $SHELL executable name
+_SHELL_TYPES = {
+    "zsh": "zsh",
+    "bash": "bash",
+    "fish": "fish",
+    "csh": "csh",
+    "tcsh": "csh",
+}
+
+# Characters stripped from the end of a shell name to drop its version
+_VERSION_SUFFIX_CHARS = "0123456789.-_"
+
+
+# AWS_PROFILE export command for each shell type; anything else gets the
+# bash/zsh syntax
+_EXPORT_TEMPLATES = {
+    "powershell": '$env:AWS_PROFILE = "{}"',
+    "cmd": 'set AWS_PROFILE={}',
+    "fish": 'set -gx AWS_PROFILE "{}"',
+    "csh": 'setenv AWS_PROFILE "{}"',
+    "tcsh": 'setenv AWS_PROFILE "{}"',
+}
+_DEFAULT_EXPORT_TEMPLATE = 'export AWS_PROFILE="{}"'
+
+# Unset commands keyed by shell type; anything else uses bash/zsh syntax
+_UNSET_COMMANDS = {
+    "powershell": 'Remove-Variable -Name AWS_PROFILE -ErrorAction SilentlyContinue',
+    "cmd": 'set AWS_PROFILE=',
+    "fish": 'set -e AWS_PROFILE',
+    "csh": 'unsetenv AWS_PROFILE',
+    "tcsh": 'unsetenv AWS_PROFILE',
+}
+_DEFAULT_UNSET_COMMAND = 'unset AWS_PROFILE'
+
+
+@functools.lru_cache(maxsize=8)
+def _classify_shell(system: str, shell: str, has_ps_module_path: bool) -> str:
+    """Map the platform and shell environment to a shell type."""
+    # Check if we're on Windows
+    if system == "Windows":
+        # Check if we're in PowerShell
+        if has_ps_module_path:
+            return "powershell"
+        # Default to cmd on Windows
+        return "cmd"
+    
+    # Unix-like systems. Only Unix paths reach here, so the name is
+    # everything after the last slash; a version suffix such as "bash5" or
+    # "zsh-5.9" is ignored
+    name = shell.rpartition("/")[2]
+    shell_type = _SHELL_TYPES.get(name) or _SHELL_TYPES.get(name.rstrip(_VERSION_SUFFIX_CHARS))
+    if shell_type is not None:
+        return shell_type
+    
+    # Otherwise look for a known shell within the name, e.g. "zsh-static"
+    for known_name, shell_type in _SHELL_TYPES.items():
+        if known_name in name:
+            return shell_type
+    
+    # Default to bash for unknown shells
+    return "bash"
+
+
 class ShellDetector:
     """Detects the current shell environment and generates appropriate commands."""
     
     @staticmethod
     def detect_shell() -> str:
         """Detect the current shell environment."""
-        # Check if we're on Windows
-        if platform.system() == "Windows":
-            # Check if we're in PowerShell
-            if os.environ.get("PSModulePath"):
-                return "powershell"
-            # Default to cmd on Windows
-            return "cmd"
-        
-        # Unix-like systems
-        shell = os.environ.get("SHELL", "")
-        if "zsh" in shell:
-            return "zsh"
-        elif "bash" in shell:
-            return "bash"
-        elif "fish" in shell:
-            return "fish"
-        elif "csh" in shell or "tcsh" in shell:
-            return "csh"
-        else:
-            # Default to bash for unknown shells
-            return "bash"
+        # The classification is memoized on its inputs, so repeated calls in
+        # the same environment skip the lookup while still following changes
+        return _classify_shell(
+            platform.system(),
+            os.environ.get("SHELL", ""),
+            bool(os.environ.get("PSModulePath")),
+        )
     
     @staticmethod
     def generate_export_command(profile_name: str, shell: Optional[str] = None) -> str:
@@ -39,17 +89,7 @@ class ShellDetector:
         if shell is None:
             shell = ShellDetector.detect_shell()
         
-        if shell == "powershell":
-            return f'$env:AWS_PROFILE = "{profile_name}"'
-        elif shell == "cmd":
-            return f'set AWS_PROFILE={profile_name}'
-        elif shell == "fish":
-            return f'set -gx AWS_PROFILE "{profile_name}"'
-        elif shell in ["csh", "tcsh"]:
-            return f'setenv AWS_PROFILE "{profile_name}"'
-        else:
-            # Default to bash/zsh syntax
-            return f'export AWS_PROFILE="{profile_name}"'
+        return _EXPORT_TEMPLATES.get(shell, _DEFAULT_EXPORT_TEMPLATE).format(profile_name)
     
     @staticmethod
     def generate_unset_command(shell: Optional[str] = None) -> str:
@@ -57,14 +97,4 @@ class ShellDetector:
         if shell is None:
             shell = ShellDetector.detect_shell()
         
-        if shell == "powershell":
-            return 'Remove-Variable -Name AWS_PROFILE -ErrorAction SilentlyContinue'
-        elif shell == "cmd":
-            return 'set AWS_PROFILE='
-        elif shell == "fish":
-            return 'set -e AWS_PROFILE'
-        elif shell in ["csh", "tcsh"]:
-            return 'unsetenv AWS_PROFILE'
-        else:
-            # Default to bash/zsh syntax
-            return 'unset AWS_PROFILE'
\ No newline at end of file
+        return _UNSET_COMMANDS.get(shell, _DEFAULT_UNSET_COMMAND)
\ No newline at end of file
@@ -1,48 +1,93 @@
 """User interface components using prompt_toolkit."""
 
-from typing import List, Optional, Callable, Any
+import functools
+import itertools
+import sys
+from typing import Dict, List, Optional, Callable, Set, Tuple
 from prompt_toolkit import prompt
 from prompt_toolkit.completion import Completer, Completion
 from prompt_toolkit.key_binding import KeyBindings
-from prompt_toolkit.shortcuts import radiolist_dialog, message_dialog
 from prompt_toolkit.styles import Style
-from prompt_toolkit.formatted_text import HTML
-from prompt_toolkit.application import Application
-from prompt_toolkit.layout.containers import HSplit, VSplit
-from prompt_toolkit.layout.layout import Layout
-from prompt_toolkit.widgets import TextArea, Frame, Label
-from prompt_toolkit.layout.controls import BufferControl
-from prompt_toolkit.buffer import Buffer
 from prompt_toolkit.keys import Keys
 
-from .models import SSOProfile
+from .models import SSOProfile, group_roles_by_account
 from .search import FuzzySearcher
 
+# Queries shorter than this match too much to be worth completing
+MIN_COMPLETION_QUERY_LENGTH = 2
+
+# Completion menus never list more than this many entries
+MAX_COMPLETIONS = 10
+
+# Above this many profiles, completions only appear on Tab
+COMPLETE_WHILE_TYPING_MAX_PROFILES = 200
+
+
+def _write_lines(lines: List[str]) -> None:
+    """Write a block of lines to stdout with a single write and flush."""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+
+def _parse_choice(choice: str, length: int) -> Optional[int]:
+    """Return the zero-based index for a 1-based numeric choice, or None."""
+    # Only plain digits are numbers here; int() alone would also take
+    # signs, surrounding spaces and underscores. isdecimal() admits exactly
+    # the digits int() accepts
+    if not choice.isdecimal():
+        return None
+    idx = int(choice) - 1
+    return idx if 0 <= idx < length else None
+
+
+def _bigrams(text: str) -> Set[str]:
+    """Return the set of two-character substrings of text."""
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
 
 class ProfileCompleter(Completer):
     """Custom completer for profile selection."""
     
-    def __init__(self, get_completions_func: Callable[[str], List[str]]):
+    def __init__(self, get_completions_func: Callable[[str], List[str]], cache_size: int = 128):
         """Initialize with a function that provides completions."""
         self.get_completions_func = get_completions_func
+        self._cache: Dict[str, List[str]] = {}
+        self._cache_size = cache_size
+    
+    def _completions_for(self, word: str) -> List[str]:
+        """Return completions for a word, reusing earlier results."""
+        completions = self._cache.get(word)
+        if completions is None:
+            if len(self._cache) >= self._cache_size:
+                self._cache.clear()
+            completions = self._cache[word] = list(self.get_completions_func(word))
+        return completions
+    
+    def clear_cache(self) -> None:
+        """Forget cached completions, e.g. after the profiles change."""
+        self._cache.clear()
     
     def get_completions(self, document, complete_event):
         """Get completions for the current document."""
         word = document.get_word_before_cursor()
-        completions = self.get_completions_func(word)
+        start = -len(word)
         
-        for completion in completions:
-            yield Completion(completion, start_position=-len(word))
+        for completion in self._completions_for(word):
+            if completion:
+                yield Completion(completion, start_position=start)
 
 
 
 class InlineProfileSelector:
     """Inline profile selector that doesn't use modal dialogs."""
     
-    def __init__(self, profiles: List[SSOProfile]):
+    def __init__(self, profiles: List[SSOProfile], searcher: Optional[FuzzySearcher] = None):
         """Initialize the profile selector."""
         self.profiles = profiles
-        self.searcher = FuzzySearcher(profiles)
+        self.searcher = searcher if searcher is not None else FuzzySearcher(profiles)
+        self._complete_while_typing = len(profiles) <= COMPLETE_WHILE_TYPING_MAX_PROFILES
+        self._by_name = {p.profile_name: p for p in profiles}
+        self._profile_names_set = set(self._by_name)
     
     def select_from_recent(self, recent_profiles: List[str]) -> Optional[str]:
         """Select from recent profiles using inline completion."""
@@ -52,41 +97,53 @@ class InlineProfileSelector:
         # Filter recent profiles to only include valid ones
         valid_recent = []
         for profile_name in recent_profiles:
-            profile = next((p for p in self.profiles if p.profile_name == profile_name), None)
-            if profile:
+            if profile_name in self._profile_names_set:
                 valid_recent.append(profile_name)
         
         if not valid_recent:
             return None
+        recent_lower = [(p, p.casefold()) for p in valid_recent]
         
         # Create completer that prioritizes recent profiles
         def get_completions(query: str) -> List[str]:
             if not query.strip():
                 return valid_recent
             
-            # Search in recent profiles first
-            recent_matches = [p for p in valid_recent if query.lower() in p.lower()]
-            if recent_matches:
+            if query in valid_recent:
+                return [query]
+            
+            # Search in recent profiles first, prefix matches before substrings
+            query_lower = query.casefold()
+            prefix_matches = list(itertools.islice(
+                (p for p, p_lower in recent_lower if p_lower.startswith(query_lower)), MAX_COMPLETIONS
+            ))
+            if prefix_matches:
+                return prefix_matches
+            recent_matches = list(itertools.islice(
+                (p for p, p_lower in recent_lower if query_lower in p_lower), MAX_COMPLETIONS
+            ))
+            if recent_matches or len(query) < MIN_COMPLETION_QUERY_LENGTH:
                 return recent_matches
             
             # Fall back to general search
-            profile_matches = self.searcher.search_profiles(query)
-            return [p.profile_name for p in profile_matches[:10]]
+            profile_matches = self.searcher.search_profiles(query, limit=MAX_COMPLETIONS)
+            return [p.profile_name for p in profile_matches]
         
         completer = ProfileCompleter(get_completions)
         
         try:
-            print("Recent profiles available:")
-            for i, profile_name in enumerate(valid_recent[:5], 1):
-                profile = next(p for p in self.profiles if p.profile_name == profile_name)
-                print(f"  {i}. {profile_name} ({profile.display_name})")
-            
-            print("\nType profile name or part of it (Tab for completion):")
+            lines = ["Recent profiles available:"]
+            lines.extend(
+                f"  {i}. {profile_name} ({self._by_name[profile_name].display_name})"
+                for i, profile_name in enumerate(valid_recent[:5], 1)
+            )
+            lines.append("\nType profile name or part of it (Tab for completion):")
+            _write_lines(lines)
             
             result = prompt(
                 "Profile: ",
                 completer=completer,
-                complete_while_typing=True,
+                complete_while_typing=self._complete_while_typing,
                 default=""
             ).strip()
             
@@ -94,11 +151,11 @@ class InlineProfileSelector:
                 return None
             
             # Check if result is a valid profile name
-            if result in [p.profile_name for p in self.profiles]:
+            if result in self._profile_names_set:
                 return result
             
             # Try to find best match
-            all_profiles = [p.profile_name for p in self.profiles]
+            all_profiles = list(self._by_name)
             best_match, score = self.searcher.get_best_match(result, all_profiles)
             
             if score > 70:
@@ -113,14 +170,66 @@ class InlineProfileSelector:
 class ProfileSelector:
     """Interactive profile selector using prompt_toolkit."""
     
-    def __init__(self, profiles: List[SSOProfile]):
-        """Initialize the profile selector."""
+    def __init__(
+        self,
+        profiles: List[SSOProfile],
+        account_names: Optional[Tuple[str, ...]] = None,
+        roles_by_account: Optional[Dict[str, Tuple[str, ...]]] = None,
+        profiles_by_account_role: Optional[Dict[Tuple[str, str], List[SSOProfile]]] = None,
+    ):
+        """Initialize the profile selector.
+        
+        The parser's prebuilt indexes may be passed in to skip rebuilding them;
+        any that are missing are built here from the profiles.
+        """
         self.profiles = profiles
-        self.searcher = FuzzySearcher(profiles)
-        self.inline_selector = InlineProfileSelector(profiles)
+        self._complete_while_typing = len(profiles) <= COMPLETE_WHILE_TYPING_MAX_PROFILES
+        self._by_name = {p.profile_name: p for p in profiles}
+        self._profile_names_set = set(self._by_name)
         
-        # Define UI style
-        self.style = Style.from_dict({
+        # Sorted account and role names, computed once instead of per keystroke
+        if account_names is None or roles_by_account is None:
+            roles_by_account = group_roles_by_account(profiles)
+            account_names = tuple(roles_by_account)
+        if profiles_by_account_role is None:
+            profiles_by_account_role = {}
+            for profile in profiles:
+                profiles_by_account_role.setdefault(
+                    (profile.sso_account_name, profile.sso_role_name), []
+                ).append(profile)
+        self._by_account_role = profiles_by_account_role
+        self._all_accounts_sorted: List[str] = list(account_names)
+        self._all_accounts_set = set(self._all_accounts_sorted)
+        self._roles_by_account: Dict[str, List[str]] = {
+            account: list(roles_for_account) for account, roles_for_account in roles_by_account.items()
+        }
+        
+        # Casefolded mirrors so completion filters don't fold case per keystroke;
+        # casefold also matches Unicode variants that lower() misses (ß/ss)
+        self._accounts_lower: List[Tuple[str, str]] = [
+            (account, account.casefold()) for account in self._all_accounts_sorted
+        ]
+        self._roles_lower_by_account: Dict[str, List[Tuple[str, str]]] = {
+            account: [(role, role.casefold()) for role in roles_for_account]
+            for account, roles_for_account in self._roles_by_account.items()
+        }
+        
+        # Bigram -> positions in _accounts_lower, to narrow substring scans
+        self._bigrams: Dict[str, Set[int]] = {}
+        for index, (_, account_lower) in enumerate(self._accounts_lower):
+            for bigram in _bigrams(account_lower):
+                self._bigrams.setdefault(bigram, set()).add(index)
+        
+        self.searcher = FuzzySearcher(profiles, account_names, roles_by_account)
+        self.inline_selector = InlineProfileSelector(profiles, searcher=self.searcher)
+        
+        # Both account prompts share one completer, and with it its cache
+        self._account_completer = ProfileCompleter(self._account_completions)
+    
+    @functools.cached_property
+    def style(self) -> Style:
+        """UI style for dialogs, built on first use."""
+        return Style.from_dict({
             'dialog': 'bg:#4444aa',
             'dialog.body': 'bg:#ffffff #000000',
             'dialog.body label': 'bg:#ffffff #000000',
@@ -134,19 +243,80 @@ class ProfileSelector:
             'button.focused': 'bg:#ffffff #000000',
         })
     
+    def _account_candidates(self, query_lower: str) -> List[Tuple[str, str]]:
+        """Return the (account, casefolded) pairs that may contain the query."""
+        if len(query_lower) < 2:
+            return self._accounts_lower
+        
+        # Every bigram of the query must occur in a matching account
+        positions: Optional[Set[int]] = None
+        for bigram in _bigrams(query_lower):
+            matches = self._bigrams.get(bigram)
+            if not matches:
+                return []
+            positions = set(matches) if positions is None else positions & matches
+            if not positions:
+                return []
+        
+        return [self._accounts_lower[index] for index in sorted(positions or ())]
+    
+    def _account_completions(self, query: str) -> List[str]:
+        """Return account completions for the text typed so far."""
+        if len(query.strip()) < MIN_COMPLETION_QUERY_LENGTH:
+            # Don't show completions until the query narrows things down
+            return []
+        
+        # An exact account name needs no further matching
+        if query in self._all_accounts_set:
+            return [query]
+        
+        query_lower = query.casefold()
+        candidates = self._account_candidates(query_lower)
+        
+        # Prefix matches rank ahead of substring matches
+        # Both filters stop as soon as a full menu has been found
+        prefix_accounts = list(itertools.islice(
+            (acc for acc, acc_lower in candidates if acc_lower.startswith(query_lower)),
+            MAX_COMPLETIONS,
+        ))
+        if prefix_accounts:
+            return prefix_accounts
+        
+        # Filter accounts that contain the query (case-insensitive)
+        matching_accounts = list(itertools.islice(
+            (acc for acc, acc_lower in candidates if query_lower in acc_lower),
+            MAX_COMPLETIONS,
+        ))
+        
+        # If we have exact substring matches, prefer them
+        if matching_accounts:
+            return matching_accounts
+        
+        # Otherwise, fall back to fuzzy search, which caches its own results
+        return self.searcher.search_accounts(query_lower, limit=MAX_COMPLETIONS)
+    
+    def _only_account(self) -> str:
+        """Return the sole account without prompting."""
+        account_name = self._all_accounts_sorted[0]
+        print(f"Using account: {account_name}")
+        return account_name
+    
     def show_recent_profiles(self, recent_profiles: List[str]) -> Optional[str]:
         """Show recent profiles inline."""
         return self.inline_selector.select_from_recent(recent_profiles)
     
     def search_accounts_with_history(self, recent_profiles: List[str]) -> Optional[str]:
         """Interactive account search with history support via arrow keys."""
+        if len(self._all_accounts_sorted) == 1:
+            return self._only_account()
+        
         if not recent_profiles:
             return self.search_accounts()
         
         # Limit to 5 recent profiles and get their account names
         valid_recent = []
         for profile_name in recent_profiles[:5]:
-            profile = next((p for p in self.profiles if p.profile_name == profile_name), None)
+            profile = self._by_name.get(profile_name)
             if profile:
                 valid_recent.append((profile_name, profile.sso_account_name))
         
@@ -180,40 +350,22 @@ class ProfileSelector:
                 event.app.current_buffer.text = ""
                 event.app.current_buffer.cursor_position = 0
         
-        # Create a simple completer for account names
-        def get_account_completions(query: str) -> List[str]:
-            if not query.strip():
-                return []
-            
-            all_accounts = sorted(list(set(profile.sso_account_name for profile in self.profiles)))
-            query_lower = query.lower()
-            
-            # Filter accounts that contain the query (case-insensitive)
-            matching_accounts = [
-                acc for acc in all_accounts 
-                if query_lower in acc.lower()
-            ]
-            
-            # If we have exact substring matches, prefer them
-            if matching_accounts:
-                return matching_accounts[:10]
-            
-            # Otherwise, fall back to fuzzy search
-            return self.searcher.search_accounts(query)[:10]
-        
-        completer = ProfileCompleter(get_account_completions)
+        completer = self._account_completer
         
         try:
-            print("Type account name (or use ↑↓ for recent profiles):")
+            lines = ["Type account name (or use ↑↓ for recent profiles):"]
             if valid_recent:
-                print("Recent profiles:")
-                for i, (profile_name, account_name) in enumerate(valid_recent):
-                    print(f"  {account_name} (from {profile_name})")
+                lines.append("Recent profiles:")
+                lines.extend(
+                    f"  {account_name} (from {profile_name})"
+                    for profile_name, account_name in valid_recent
+                )
+            _write_lines(lines)
             
             result = prompt(
                 "Account: ",
                 completer=completer,
-                complete_while_typing=True,
+                complete_while_typing=self._complete_while_typing,
                 key_bindings=bindings,
                 default=""
             ).strip()
@@ -222,30 +374,30 @@ class ProfileSelector:
                 return None
             
             # Check if result is a valid account name
-            all_accounts_set = set(profile.sso_account_name for profile in self.profiles)
-            if result in all_accounts_set:
+            if result in self._all_accounts_set:
                 return result
             
-            # Try to find the best match
-            best_match, score = self.searcher.get_best_match(result, list(all_accounts_set))
-            if score > 70:  # High confidence match
+            # Score all accounts once: the top hit is the best match and
+            # the rest are offered as similar accounts
+            scored = self.searcher.get_matches(result, self._all_accounts_sorted, limit=5)
+            if scored and scored[0][1] > 70:  # High confidence match
+                best_match = scored[0][0]
                 print(f"Using best match: {best_match}")
                 return best_match
             
             # Show available matches
-            matches = self.searcher.search_accounts(result)
+            matches = [match for match, _ in scored]
             if matches:
-                print(f"No exact match found. Similar accounts:")
-                for i, match in enumerate(matches[:5], 1):
-                    print(f"  {i}. {match}")
+                lines = ["No exact match found. Similar accounts:"]
+                lines.extend(f"  {i}. {match}" for i, match in enumerate(matches, 1))
+                _write_lines(lines)
                 
                 try:
                     choice = prompt("Select number or type account name: ").strip()
-                    if choice.isdigit():
-                        idx = int(choice) - 1
-                        if 0 <= idx < len(matches):
-                            return matches[idx]
-                    elif choice:
+                    idx = _parse_choice(choice, len(matches))
+                    if idx is not None:
+                        return matches[idx]
+                    if choice and not choice.isdecimal():
                         # Try the typed input again
                         best_match, score = self.searcher.get_best_match(choice, matches)
                         if score > 50:
@@ -261,44 +413,25 @@ class ProfileSelector:
 
     def search_accounts(self, initial_query: str = "") -> Optional[str]:
         """Interactive account search."""
-        def get_account_completions(query: str) -> List[str]:
-            if not query.strip():
-                # Don't show any completions when no query is entered
-                return []
-            
-            all_accounts = sorted(list(set(profile.sso_account_name for profile in self.profiles)))
-            query_lower = query.lower()
-            
-            # Filter accounts that contain the query (case-insensitive)
-            matching_accounts = [
-                acc for acc in all_accounts 
-                if query_lower in acc.lower()
-            ]
-            
-            # If we have exact substring matches, prefer them
-            if matching_accounts:
-                return matching_accounts[:10]
-            
-            # Otherwise, fall back to fuzzy search
-            return self.searcher.search_accounts(query)[:10]
+        if len(self._all_accounts_sorted) == 1:
+            return self._only_account()
         
-        completer = ProfileCompleter(get_account_completions)
+        completer = self._account_completer
         
         try:
             # Show available accounts
-            all_accounts = sorted(list(set(profile.sso_account_name for profile in self.profiles)))
-            print("Available accounts:")
-            for i, account in enumerate(all_accounts[:10], 1):
-                print(f"  {i}. {account}")
+            all_accounts = self._all_accounts_sorted
+            lines = ["Available accounts:"]
+            lines.extend(f"  {i}. {account}" for i, account in enumerate(all_accounts[:10], 1))
             if len(all_accounts) > 10:
-                print(f"  ... and {len(all_accounts) - 10} more")
-            
-            print("\nType account name or part of it (Tab for completion):")
+                lines.append(f"  ... and {len(all_accounts) - 10} more")
+            lines.append("\nType account name or part of it (Tab for completion):")
+            _write_lines(lines)
             
             account_name = prompt(
                 "Account: ",
                 completer=completer,
-                complete_while_typing=True,
+                complete_while_typing=self._complete_while_typing,
                 default=initial_query
             ).strip()
             
@@ -306,30 +439,30 @@ class ProfileSelector:
                 return None
             
             # Check if the entered account name is valid
-            all_accounts_set = set(profile.sso_account_name for profile in self.profiles)
-            if account_name in all_accounts_set:
+            if account_name in self._all_accounts_set:
                 return account_name
             
-            # Try to find the best match
-            best_match, score = self.searcher.get_best_match(account_name, list(all_accounts_set))
-            if score > 70:  # High confidence match
+            # Score all accounts once: the top hit is the best match and
+            # the rest are offered as similar accounts
+            scored = self.searcher.get_matches(account_name, self._all_accounts_sorted, limit=5)
+            if scored and scored[0][1] > 70:  # High confidence match
+                best_match = scored[0][0]
                 print(f"Using best match: {best_match}")
                 return best_match
             
             # Show available matches
-            matches = self.searcher.search_accounts(account_name)
+            matches = [match for match, _ in scored]
             if matches:
-                print(f"No exact match found. Similar accounts:")
-                for i, match in enumerate(matches[:5], 1):
-                    print(f"  {i}. {match}")
+                lines = ["No exact match found. Similar accounts:"]
+                lines.extend(f"  {i}. {match}" for i, match in enumerate(matches, 1))
+                _write_lines(lines)
                 
                 try:
                     choice = prompt("Select number or type account name: ").strip()
-                    if choice.isdigit():
-                        idx = int(choice) - 1
-                        if 0 <= idx < len(matches):
-                            return matches[idx]
-                    elif choice:
+                    idx = _parse_choice(choice, len(matches))
+                    if idx is not None:
+                        return matches[idx]
+                    if choice and not choice.isdecimal():
                         # Try the typed input again
                         best_match, score = self.searcher.get_best_match(choice, matches)
                         if score > 50:
@@ -345,52 +478,56 @@ class ProfileSelector:
     
     def search_roles(self, account_name: str, initial_query: str = "") -> Optional[str]:
         """Interactive role search for a specific account."""
+        # Nothing to choose between, so skip the prompt entirely
+        available_roles = self._roles_by_account.get(account_name, [])
+        if len(available_roles) == 1:
+            print(f"Using role: {available_roles[0]}")
+            return available_roles[0]
+        
         def get_role_completions(query: str) -> List[str]:
-            if not query.strip():
-                # Don't show any completions when no query is entered
+            if len(query.strip()) < MIN_COMPLETION_QUERY_LENGTH:
+                # Don't show completions until the query narrows things down
                 return []
             
-            # Get all roles for this account
-            available_roles = sorted(list(set([
-                profile.sso_role_name
-                for profile in self.profiles
-                if profile.sso_account_name == account_name
-            ])))
+            if query in available_roles:
+                return [query]
+            
+            # Prefix matches rank ahead of substring matches
+            query_lower = query.casefold()
+            roles_lower = self._roles_lower_by_account.get(account_name, [])
+            prefix_roles = list(itertools.islice(
+                (role for role, role_lower in roles_lower if role_lower.startswith(query_lower)),
+                MAX_COMPLETIONS,
+            ))
+            if prefix_roles:
+                return prefix_roles
             
             # Filter roles that contain the query (case-insensitive)
-            query_lower = query.lower()
-            matching_roles = [
-                role for role in available_roles 
-                if query_lower in role.lower()
-            ]
+            matching_roles = list(itertools.islice(
+                (role for role, role_lower in roles_lower if query_lower in role_lower),
+                MAX_COMPLETIONS,
+            ))
             
             # If we have exact substring matches, prefer them
             if matching_roles:
-                return matching_roles[:10]
+                return matching_roles
             
-            # Otherwise, fall back to fuzzy search
-            return self.searcher.search_roles(query, account_name)
+            # Otherwise, fall back to fuzzy search, which caches its own results
+            return self.searcher.search_roles(query_lower, account_name, limit=MAX_COMPLETIONS)
         
         completer = ProfileCompleter(get_role_completions)
         
         try:
             # Show available roles for this account
-            available_roles = sorted(list(set([
-                profile.sso_role_name
-                for profile in self.profiles
-                if profile.sso_account_name == account_name
-            ])))
-            
-            print(f"Available roles for '{account_name}':")
-            for i, role in enumerate(available_roles, 1):
-                print(f"  {i}. {role}")
-            
-            print("\nType role name or part of it (Tab for completion):")
+            lines = [f"Available roles for '{account_name}':"]
+            lines.extend(f"  {i}. {role}" for i, role in enumerate(available_roles, 1))
+            lines.append("\nType role name or part of it (Tab for completion):")
+            _write_lines(lines)
             
             role_name = prompt(
                 "Role: ",
                 completer=completer,
-                complete_while_typing=True,
+                complete_while_typing=self._complete_while_typing,
                 default=initial_query
             ).strip()
             
@@ -401,26 +538,27 @@ class ProfileSelector:
             if role_name in available_roles:
                 return role_name
             
-            # Try to find the best match
-            best_match, score = self.searcher.get_best_match(role_name, available_roles)
-            if score > 70:  # High confidence match
+            # Score all roles once: the top hit is the best match and
+            # the rest are offered as similar roles
+            scored = self.searcher.get_matches(role_name, available_roles, limit=10)
+            if scored and scored[0][1] > 70:  # High confidence match
+                best_match = scored[0][0]
                 print(f"Using best match: {best_match}")
                 return best_match
             
             # Show available matches
-            matches = self.searcher.search_roles(role_name, account_name)
+            matches = [match for match, _ in scored]
             if matches:
-                print(f"No exact match found. Similar roles:")
-                for i, match in enumerate(matches, 1):
-                    print(f"  {i}. {match}")
+                lines = ["No exact match found. Similar roles:"]
+                lines.extend(f"  {i}. {match}" for i, match in enumerate(matches, 1))
+                _write_lines(lines)
                 
                 try:
                     choice = prompt("Select number or type role name: ").strip()
-                    if choice.isdigit():
-                        idx = int(choice) - 1
-                        if 0 <= idx < len(matches):
-                            return matches[idx]
-                    elif choice:
+                    idx = _parse_choice(choice, len(matches))
+                    if idx is not None:
+                        return matches[idx]
+                    if choice and not choice.isdecimal():
                         # Try the typed input again
                         best_match, score = self.searcher.get_best_match(choice, matches)
                         if score > 50:
@@ -436,10 +574,7 @@ class ProfileSelector:
     
     def select_profile(self, account_name: str, role_name: str) -> Optional[str]:
         """Select a profile from matching account and role."""
-        matching_profiles = [
-            profile for profile in self.profiles
-            if profile.sso_account_name == account_name and profile.sso_role_name == role_name
-        ]
+        matching_profiles = self._by_account_role.get((account_name, role_name), [])
         
         if not matching_profiles:
             return None
@@ -448,16 +583,18 @@ class ProfileSelector:
             return matching_profiles[0].profile_name
         
         # Multiple profiles match, let user choose
-        print(f"Multiple profiles found for {account_name} - {role_name}:")
-        for i, profile in enumerate(matching_profiles, 1):
-            print(f"  {i}. {profile.profile_name} (Account ID: {profile.sso_account_id})")
+        lines = [f"Multiple profiles found for {account_name} - {role_name}:"]
+        lines.extend(
+            f"  {i}. {profile.profile_name} (Account ID: {profile.sso_account_id})"
+            for i, profile in enumerate(matching_profiles, 1)
+        )
+        _write_lines(lines)
         
         try:
             choice = prompt("Select number: ").strip()
-            if choice.isdigit():
-                idx = int(choice) - 1
-                if 0 <= idx < len(matching_profiles):
-                    return matching_profiles[idx].profile_name
+            idx = _parse_choice(choice, len(matching_profiles))
+            if idx is not None:
+                return matching_profiles[idx].profile_name
             
             return None
             
@@ -0,0 +1,99 @@
+"""Shared fixtures for AWS Profile Switch tests."""
+
+from pathlib import Path
+from typing import Callable, Dict, Iterator
+from unittest.mock import MagicMock
+
+import pytest
+
+from .configs import (
+    MIXED_CONFIG,
+    REGULAR_PROFILE,
+    SSO_CONFIG_SINGLE,
+    generate_config,
+)
+
+
+def pytest_configure(config) -> None:
+    """Register the markers used by this suite."""
+    # pytest.ini's [tool:pytest] section is not read by pytest, so this is
+    # the one place markers are registered
+    config.addinivalue_line("markers", "slow: tests that take noticeably longer than the rest")
+    config.addinivalue_line("markers", "serial: timing-sensitive tests kept together on one xdist worker")
+
+
+def pytest_collection_modifyitems(config, items) -> None:
+    """Send serial tests to one xdist worker when running with --dist loadgroup."""
+    if not config.pluginmanager.hasplugin("xdist"):
+        return
+    for item in items:
+        if item.get_closest_marker("serial"):
+            item.add_marker(pytest.mark.xdist_group("serial"))
+
+
+def _use_home(monkeypatch, home: Path) -> None:
+    """Make Path.home(), and so the default cache and history files, resolve under ``home``."""
+    monkeypatch.setattr(Path, "home", classmethod(lambda cls: home))
+
+
+@pytest.fixture(autouse=True, scope="session")
+def isolated_session_home(tmp_path_factory) -> Iterator[Path]:
+    """Keep module- and class-scoped fixtures out of the real home directory."""
+    home = tmp_path_factory.mktemp("home")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        _use_home(monkeypatch, home)
+        yield home
+
+
+@pytest.fixture(autouse=True)
+def isolated_home(tmp_path_factory, monkeypatch) -> Path:
+    """Give each test its own home directory for default cache and history files."""
+    home = tmp_path_factory.mktemp("home")
+    _use_home(monkeypatch, home)
+    return home
+
+
+def write_config(tmp_path_factory, content: str) -> Path:
+    """Write config content to a fresh temporary directory."""
+    config_file = tmp_path_factory.mktemp("cfg") / "config"
+    config_file.write_text(content)
+    return config_file
+
+
+@pytest.fixture(scope="module")
+def sso_config_single(tmp_path_factory) -> Path:
+    """Config with a single SSO profile."""
+    return write_config(tmp_path_factory, SSO_CONFIG_SINGLE)
+
+
+@pytest.fixture(scope="module")
+def mixed_config(tmp_path_factory) -> Path:
+    """Config with two SSO profiles and one access-key profile."""
+    return write_config(tmp_path_factory, MIXED_CONFIG)
+
+
+@pytest.fixture(scope="module")
+def no_sso_config(tmp_path_factory) -> Path:
+    """Config with only an access-key profile."""
+    return write_config(tmp_path_factory, REGULAR_PROFILE)
+
+
+@pytest.fixture(scope="session")
+def large_config(tmp_path_factory) -> Callable[[int], Path]:
+    """Factory for generated configs, writing each profile count only once."""
+    written: Dict[int, Path] = {}
+    
+    def config_with(n: int) -> Path:
+        if n not in written:
+            written[n] = write_config(tmp_path_factory, generate_config(n))
+        return written[n]
+    
+    return config_with
+
+
+@pytest.fixture
+def mock_selector(monkeypatch) -> MagicMock:
+    """Stand-in for the ProfileSelector that AWSProfileSwitcher creates."""
+    selector = MagicMock()
+    monkeypatch.setattr("aws_profile_switch.ui.ProfileSelector", lambda *args, **kwargs: selector)
+    return selector
\ No newline at end of file
@@ -1,11 +1,61 @@
 """Tests for AWS config parser."""
 
+import io
+import os
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
 import pytest
 
-from aws_profile_switch.config_parser import AWSConfigParser
-from aws_profile_switch.exceptions import ConfigFileNotFoundError, ConfigParseError, InvalidProfileError
+from aws_profile_switch.config_parser import AWSConfigParser, _PARSE_CACHE
+from aws_profile_switch.exceptions import ConfigFileNotFoundError, ConfigParseError
+
+
+# Profiles shared by the lookup tests, which only read from the parser
+LOOKUP_CONFIG = """
+[profile test-profile]
+sso_start_url = https://example.awsapps.com/start
+sso_region = us-east-1
+sso_account_id = 123456789014
+sso_role_name = AdministratorAccess
+sso_account_name = Test Account
+
+[profile profile1]
+sso_start_url = https://example.awsapps.com/start
+sso_region = us-east-1
+sso_account_id = 123456789012
+sso_role_name = AdministratorAccess
+sso_account_name = Account 1
+
+[profile profile2]
+sso_start_url = https://example.awsapps.com/start
+sso_region = us-west-2
+sso_account_id = 123456789012
+sso_role_name = AdministratorAccess
+sso_account_name = Account 1
+
+[profile profile3]
+sso_start_url = https://example.awsapps.com/start
+sso_region = us-east-1
+sso_account_id = 123456789013
+sso_role_name = AdministratorAccess
+sso_account_name = Account 2
+
+[profile profile4]
+sso_start_url = https://example.awsapps.com/start
+sso_region = us-east-1
+sso_account_id = 123456789012
+sso_role_name = ReadOnlyAccess
+sso_account_name = Account 1
+"""
+
+
+@pytest.fixture(scope="module")
+def parsed_parser():
+    """Parse the shared lookup config once for this module."""
+    parser = AWSConfigParser(LOOKUP_CONFIG)
+    parser.parse_config()
+    return parser
 
 
 class TestAWSConfigParser:
@@ -31,24 +81,19 @@ region = us-east-1
 output = json
 """
         
-        config_file = self.create_test_config(config_content)
-        parser = AWSConfigParser(config_file)
+        parser = AWSConfigParser(config_content)
         
-        try:
-            profiles = parser.parse_config()
-            
-            assert len(profiles) == 1
-            profile = profiles[0]
-            
-            assert profile.profile_name == "test-profile"
-            assert profile.sso_account_name == "Test Account"
-            assert profile.sso_account_id == "123456789012"
-            assert profile.sso_role_name == "AdministratorAccess"
-            assert profile.sso_start_url == "https://example.awsapps.com/start"
-            assert profile.sso_region == "us-east-1"
-            
-        finally:
-            config_file.unlink()
+        profiles = parser.parse_config()
+        
+        assert len(profiles) == 1
+        profile = profiles[0]
+        
+        assert profile.profile_name == "test-profile"
+        assert profile.sso_account_name == "Test Account"
+        assert profile.sso_account_id == "123456789012"
+        assert profile.sso_role_name == "AdministratorAccess"
+        assert profile.sso_start_url == "https://example.awsapps.com/start"
+        assert profile.sso_region == "us-east-1"
     
     def test_parse_sso_auto_populated_profile(self):
         """Test parsing a profile with sso_auto_populated flag."""
@@ -63,20 +108,15 @@ region = us-east-1
 output = json
 """
         
-        config_file = self.create_test_config(config_content)
-        parser = AWSConfigParser(config_file)
+        parser = AWSConfigParser(config_content)
         
-        try:
-            profiles = parser.parse_config()
-            
-            assert len(profiles) == 1
-            profile = profiles[0]
-            
-            assert profile.profile_name == "auto-profile"
-            assert profile.sso_role_name == "ReadOnlyAccess"
-            
-        finally:
-            config_file.unlink()
+        profiles = parser.parse_config()
+        
+        assert len(profiles) == 1
+        profile = profiles[0]
+        
+        assert profile.profile_name == "auto-profile"
+        assert profile.sso_role_name == "ReadOnlyAccess"
     
     def test_parse_profile_without_account_name(self):
         """Test parsing a profile without explicit account name."""
@@ -90,20 +130,15 @@ region = us-east-1
 output = json
 """
         
-        config_file = self.create_test_config(config_content)
-        parser = AWSConfigParser(config_file)
+        parser = AWSConfigParser(config_content)
         
-        try:
-            profiles = parser.parse_config()
-            
-            assert len(profiles) == 1
-            profile = profiles[0]
-            
-            assert profile.profile_name == "no-account-name"
-            assert profile.sso_account_name == "Account-123456789012"  # Generated name
-            
-        finally:
-            config_file.unlink()
+        profiles = parser.parse_config()
+        
+        assert len(profiles) == 1
+        profile = profiles[0]
+        
+        assert profile.profile_name == "no-account-name"
+        assert profile.sso_account_name == "Account-123456789012"  # Generated name
     
     def test_parse_multiple_profiles(self):
         """Test parsing multiple SSO profiles."""
@@ -130,222 +165,358 @@ aws_secret_access_key = wJalrXUtnFEMI/K7MDENG/bPxRfiCYEXAMPLEKEY
 region = us-east-1
 """
         
-        config_file = self.create_test_config(config_content)
-        parser = AWSConfigParser(config_file)
+        parser = AWSConfigParser(config_content)
         
-        try:
-            profiles = parser.parse_config()
-            
-            assert len(profiles) == 2  # Only SSO profiles
-            
-            profile_names = [p.profile_name for p in profiles]
-            assert "profile1" in profile_names
-            assert "profile2" in profile_names
-            assert "non-sso-profile" not in profile_names
-            
-        finally:
-            config_file.unlink()
+        profiles = parser.parse_config()
+        
+        assert len(profiles) == 2  # Only SSO profiles
+        
+        profile_names = [p.profile_name for p in profiles]
+        assert "profile1" in profile_names
+        assert "profile2" in profile_names
+        assert "non-sso-profile" not in profile_names
     
-    def test_parse_invalid_profile_missing_fields(self):
-        """Test parsing a profile with missing required SSO fields."""
+    def test_parse_mixed_sections_and_syntax(self):
+        """Test parsing non-profile sections, nested settings and ':' delimiters."""
         config_content = """
-[profile incomplete-profile]
-sso_start_url = https://example.awsapps.com/start
-sso_region = us-east-1
-# Missing sso_account_id and sso_role_name
+[default]
 region = us-east-1
+s3 =
+  max_concurrent_requests = 10
+
+[sso-session my-sso]
+sso_start_url = https://example.awsapps.com/start
+
+[profile colon-profile]
+sso_start_url: https://example.awsapps.com/start
+sso_region: us-east-1
+SSO_Account_ID: 123456789012
+sso_role_name: AdministratorAccess
+; comment
+sso_account_name = Team: Platform
 """
         
-        config_file = self.create_test_config(config_content)
-        parser = AWSConfigParser(config_file)
+        parser = AWSConfigParser(config_content)
         
-        try:
-            profiles = parser.parse_config()
-            
-            # Should skip invalid profiles
-            assert len(profiles) == 0
-            
-        finally:
-            config_file.unlink()
-    
-    def test_parse_nonexistent_file(self):
-        """Test parsing a non-existent config file."""
-        parser = AWSConfigParser(Path("/nonexistent/config"))
+        profiles = parser.parse_config()
         
-        with pytest.raises(ConfigFileNotFoundError):
-            parser.parse_config()
+        assert len(profiles) == 1
+        profile = profiles[0]
+        
+        assert profile.profile_name == "colon-profile"
+        assert profile.sso_account_name == "Team: Platform"
+        assert profile.sso_account_id == "123456789012"
+        assert profile.sso_start_url == "https://example.awsapps.com/start"
     
-    def test_parse_invalid_config_format(self):
-        """Test parsing a config file with invalid format."""
+    def test_parse_indented_keys(self):
+        """Test that uniformly indented keys are read as keys, as configparser does."""
         config_content = """
-This is not a valid config file format
-[profile incomplete
-missing closing bracket
+[profile indented-profile]
+  sso_start_url = https://example.awsapps.com/start
+  sso_account_id = 123456789012
+  sso_role_name = AdministratorAccess
+  sso_account_name = Indented Account
 """
         
-        config_file = self.create_test_config(config_content)
-        parser = AWSConfigParser(config_file)
+        profiles = AWSConfigParser(config_content).parse_config()
         
-        try:
-            with pytest.raises(ConfigParseError):
-                parser.parse_config()
-                
-        finally:
-            config_file.unlink()
+        assert [p.profile_name for p in profiles] == ["indented-profile"]
+        assert profiles[0].sso_account_name == "Indented Account"
+        assert profiles[0].sso_role_name == "AdministratorAccess"
     
-    def test_get_profile_by_name(self):
-        """Test getting a profile by name."""
+    def test_parse_shares_repeated_values(self):
+        """Test that repeated field values share one string object."""
         config_content = """
-[profile test-profile]
+[profile first]
 sso_start_url = https://example.awsapps.com/start
-sso_region = us-east-1
 sso_account_id = 123456789012
 sso_role_name = AdministratorAccess
-sso_account_name = Test Account
+sso_account_name = Shared Account
+
+[profile second]
+sso_start_url = https://example.awsapps.com/start
+sso_account_id = 123456789013
+sso_role_name = AdministratorAccess
+sso_account_name = Other Account
 """
         
-        config_file = self.create_test_config(config_content)
-        parser = AWSConfigParser(config_file)
+        first, second = AWSConfigParser(config_content).parse_config()
         
-        try:
-            parser.parse_config()
-            
-            profile = parser.get_profile_by_name("test-profile")
-            assert profile is not None
-            assert profile.profile_name == "test-profile"
-            
-            profile = parser.get_profile_by_name("nonexistent")
-            assert profile is None
-            
-        finally:
-            config_file.unlink()
+        assert first.sso_start_url is second.sso_start_url
+        assert first.sso_role_name is second.sso_role_name
+        
+        # Values are also shared across parsers and by the configparser
+        # fallback, which a continuation line on a kept key forces here
+        fallback_content = config_content.replace(
+            "sso_account_name = Other Account",
+            "sso_account_name = Other\n  Account",
+        )
+        other, fallback = AWSConfigParser(fallback_content).parse_config()
+        assert other.sso_start_url is first.sso_start_url
+        assert fallback.sso_role_name is first.sso_role_name
+        assert fallback.sso_account_name == "Other\nAccount"
     
-    def test_get_accounts(self):
-        """Test getting unique account names."""
+    def test_parse_percent_values_literally(self):
+        """Test that a literal % in a value is kept as written."""
         config_content = """
-[profile profile1]
+[profile percent-profile]
 sso_start_url = https://example.awsapps.com/start
-sso_region = us-east-1
 sso_account_id = 123456789012
 sso_role_name = AdministratorAccess
-sso_account_name = Account 1
-
-[profile profile2]
+sso_account_name = 50%
+"""
+        
+        profile, = AWSConfigParser(config_content).parse_config()
+        assert profile.sso_account_name == "50%"
+        
+        # The configparser fallback, forced by a continuation line, agrees
+        fallback_content = config_content.replace("50%", "50%\n  off")
+        profile, = AWSConfigParser(fallback_content).parse_config()
+        assert profile.sso_account_name == "50%\noff"
+    
+    def test_parse_text_stream(self):
+        """Test parsing config content supplied as a text stream."""
+        config_content = """
+[profile stream-profile]
 sso_start_url = https://example.awsapps.com/start
-sso_region = us-east-1
 sso_account_id = 123456789012
-sso_role_name = ReadOnlyAccess
-sso_account_name = Account 1
-
-[profile profile3]
+sso_role_name = AdministratorAccess
+sso_account_name = Stream Account
+"""
+        
+        parser = AWSConfigParser(io.StringIO(config_content))
+        
+        profiles = parser.parse_config()
+        
+        assert [p.profile_name for p in profiles] == ["stream-profile"]
+        assert parser.get_accounts() == ("Stream Account",)
+    
+    def test_path_string_is_not_content(self):
+        """Test that a single-line string is still treated as a path."""
+        parser = AWSConfigParser("/nonexistent/config")
+        
+        assert parser.config_file == Path("/nonexistent/config")
+        with pytest.raises(ConfigFileNotFoundError):
+            parser.parse_config()
+    
+    def test_parse_uses_cache_until_file_changes(self):
+        """Test that parsed profiles are reused until the config file changes."""
+        config_content = """
+[profile cached-profile]
 sso_start_url = https://example.awsapps.com/start
-sso_region = us-east-1
-sso_account_id = 123456789013
+sso_account_id = 123456789012
 sso_role_name = AdministratorAccess
-sso_account_name = Account 2
+sso_account_name = Cached Account
 """
         
         config_file = self.create_test_config(config_content)
-        parser = AWSConfigParser(config_file)
         
         try:
-            parser.parse_config()
-            
-            accounts = parser.get_accounts()
-            assert len(accounts) == 2
-            assert "Account 1" in accounts
-            assert "Account 2" in accounts
-            
+            with tempfile.TemporaryDirectory() as temp_dir:
+                cache_file = Path(temp_dir) / "cache.pkl"
+                AWSConfigParser(config_file, cache_file=cache_file).parse_config()
+                assert cache_file.exists()
+                _PARSE_CACHE.clear()
+                
+                # A cache hit must not read the config file again
+                parser = AWSConfigParser(config_file, cache_file=cache_file)
+                with patch.object(parser, "_read_profile_sections", side_effect=AssertionError):
+                    profiles = parser.parse_config()
+                assert [p.profile_name for p in profiles] == ["cached-profile"]
+                assert parser.get_accounts() == ("Cached Account",)
+                
+                # Changing the file invalidates the cache
+                config_file.write_text(config_content.replace("cached-profile", "renamed-profile"))
+                profiles = AWSConfigParser(config_file, cache_file=cache_file).parse_config()
+                assert [p.profile_name for p in profiles] == ["renamed-profile"]
+                
         finally:
             config_file.unlink()
     
-    def test_get_roles_for_account(self):
-        """Test getting roles for a specific account."""
+    def test_parse_uses_cache_when_only_mtime_changes(self):
+        """Test that touching the config file keeps the cache valid."""
         config_content = """
-[profile profile1]
+[profile touched-profile]
 sso_start_url = https://example.awsapps.com/start
-sso_region = us-east-1
 sso_account_id = 123456789012
 sso_role_name = AdministratorAccess
-sso_account_name = Account 1
-
-[profile profile2]
+sso_account_name = Touched Account
+"""
+        
+        config_file = self.create_test_config(config_content)
+        
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                cache_file = Path(temp_dir) / "cache.pkl"
+                AWSConfigParser(config_file, cache_file=cache_file).parse_config()
+                _PARSE_CACHE.clear()
+                
+                stat = config_file.stat()
+                os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+                
+                parser = AWSConfigParser(config_file, cache_file=cache_file)
+                with patch.object(parser, "_read_profile_sections", side_effect=AssertionError):
+                    profiles = parser.parse_config()
+                assert [p.profile_name for p in profiles] == ["touched-profile"]
+                # The cache was re-saved in place, leaving no temp files
+                assert list(Path(temp_dir).iterdir()) == [cache_file]
+                
+                # The cache now records the new mtime, so no hashing is needed
+                _PARSE_CACHE.clear()
+                parser = AWSConfigParser(config_file, cache_file=cache_file)
+                with patch.object(parser, "_file_digest", side_effect=AssertionError):
+                    profiles = parser.parse_config()
+                assert [p.profile_name for p in profiles] == ["touched-profile"]
+                
+        finally:
+            config_file.unlink()
+    
+    def test_failed_cache_write_leaves_no_temp_file(self, tmp_path):
+        """Test that a cache write that cannot be swapped in is cleaned up."""
+        config_file = tmp_path / "config"
+        config_file.write_text(LOOKUP_CONFIG)
+        cache_dir = tmp_path / "cache"
+        
+        parser = AWSConfigParser(config_file, cache_file=cache_dir / "cache.pkl")
+        with patch("aws_profile_switch.config_parser.os.replace", side_effect=OSError):
+            profiles = parser.parse_config()
+        
+        assert len(profiles) == 5
+        assert list(cache_dir.iterdir()) == []
+    
+    def test_parse_reuses_profiles_within_process(self):
+        """Test that a second parser in the same process skips reading the file."""
+        config_content = """
+[profile memory-profile]
 sso_start_url = https://example.awsapps.com/start
-sso_region = us-east-1
 sso_account_id = 123456789012
-sso_role_name = ReadOnlyAccess
-sso_account_name = Account 1
-
-[profile profile3]
-sso_start_url = https://example.awsapps.com/start
-sso_region = us-east-1
-sso_account_id = 123456789013
 sso_role_name = AdministratorAccess
-sso_account_name = Account 2
+sso_account_name = Memory Account
 """
         
         config_file = self.create_test_config(config_content)
-        parser = AWSConfigParser(config_file)
         
         try:
-            parser.parse_config()
-            
-            roles = parser.get_roles_for_account("Account 1")
-            assert len(roles) == 2
-            assert "AdministratorAccess" in roles
-            assert "ReadOnlyAccess" in roles
-            
-            roles = parser.get_roles_for_account("Account 2")
-            assert len(roles) == 1
-            assert "AdministratorAccess" in roles
-            
-            roles = parser.get_roles_for_account("Nonexistent Account")
-            assert len(roles) == 0
-            
+            with tempfile.TemporaryDirectory() as temp_dir:
+                first = AWSConfigParser(config_file, cache_file=Path(temp_dir) / "first.pkl")
+                first_profiles = first.parse_config()
+                
+                # A different disk cache shows the hit came from memory
+                parser = AWSConfigParser(config_file, cache_file=Path(temp_dir) / "second.pkl")
+                with patch.object(parser, "_read_profile_sections", side_effect=AssertionError):
+                    profiles = parser.parse_config()
+                
+                assert profiles == first_profiles
+                assert profiles is not first_profiles
+                assert parser.get_accounts() == ("Memory Account",)
+                
         finally:
             config_file.unlink()
     
-    def test_get_profiles_for_account_and_role(self):
-        """Test getting profiles for a specific account and role."""
+    def test_parse_invalid_profile_missing_fields(self):
+        """Test parsing a profile with missing required SSO fields."""
         config_content = """
-[profile profile1]
+[profile incomplete-profile]
 sso_start_url = https://example.awsapps.com/start
 sso_region = us-east-1
-sso_account_id = 123456789012
-sso_role_name = AdministratorAccess
-sso_account_name = Account 1
+# Missing sso_account_id and sso_role_name
+region = us-east-1
+"""
+        
+        parser = AWSConfigParser(config_content)
+        
+        profiles = parser.parse_config()
+        
+        # Should skip invalid profiles
+        assert len(profiles) == 0
+    
+    def test_parse_nonexistent_file(self):
+        """Test parsing a non-existent config file."""
+        parser = AWSConfigParser(Path("/nonexistent/config"))
+        
+        with pytest.raises(ConfigFileNotFoundError):
+            parser.parse_config()
+    
+    def test_parse_invalid_config_format(self):
+        """Test parsing a config file with invalid format."""
+        config_content = """
+This is not a valid config file format
+[profile incomplete
+missing closing bracket
+"""
+        
+        parser = AWSConfigParser(config_content)
+        
+        with pytest.raises(ConfigParseError, match="Failed to parse AWS config file"):
+            parser.parse_config()
+    
+    @pytest.mark.parametrize("config_content", [
+        """
+[default]
+region = us-east-1
+region = us-west-2
 
-[profile profile2]
+[profile dup-profile]
 sso_start_url = https://example.awsapps.com/start
-sso_region = us-west-2
 sso_account_id = 123456789012
 sso_role_name = AdministratorAccess
-sso_account_name = Account 1
-
-[profile profile3]
+""",
+        """
+[profile dup-profile]
 sso_start_url = https://example.awsapps.com/start
-sso_region = us-east-1
-sso_account_id = 123456789013
+sso_account_id = 123456789012
 sso_role_name = AdministratorAccess
-sso_account_name = Account 2
-"""
-        
-        config_file = self.create_test_config(config_content)
-        parser = AWSConfigParser(config_file)
+output = json
+Output = text
+""",
+    ], ids=["non_profile_section", "non_sso_key"])
+    def test_parse_duplicate_key_raises(self, config_content):
+        """Test that any repeated option is an error, as it is for configparser."""
+        parser = AWSConfigParser(config_content)
         
-        try:
+        with pytest.raises(ConfigParseError, match="Failed to parse AWS config file"):
             parser.parse_config()
-            
-            profiles = parser.get_profiles_for_account_and_role("Account 1", "AdministratorAccess")
-            assert len(profiles) == 2
-            
-            profile_names = [p.profile_name for p in profiles]
-            assert "profile1" in profile_names
-            assert "profile2" in profile_names
-            
-            profiles = parser.get_profiles_for_account_and_role("Account 2", "AdministratorAccess")
-            assert len(profiles) == 1
-            assert profiles[0].profile_name == "profile3"
-            
-        finally:
-            config_file.unlink()
\ No newline at end of file
+    
+    def test_get_profile_by_name(self, parsed_parser):
+        """Test getting a profile by name."""
+        profile = parsed_parser.get_profile_by_name("test-profile")
+        assert profile is not None
+        assert profile.profile_name == "test-profile"
+        
+        profile = parsed_parser.get_profile_by_name("nonexistent")
+        assert profile is None
+    
+    def test_get_accounts(self, parsed_parser):
+        """Test getting unique account names."""
+        accounts = parsed_parser.get_accounts()
+        assert len(accounts) == 3
+        assert "Account 1" in accounts
+        assert "Account 2" in accounts
+        assert "Test Account" in accounts
+    
+    def test_get_roles_for_account(self, parsed_parser):
+        """Test getting roles for a specific account."""
+        roles = parsed_parser.get_roles_for_account("Account 1")
+        assert len(roles) == 2
+        assert "AdministratorAccess" in roles
+        assert "ReadOnlyAccess" in roles
+        
+        roles = parsed_parser.get_roles_for_account("Account 2")
+        assert len(roles) == 1
+        assert "AdministratorAccess" in roles
+        
+        roles = parsed_parser.get_roles_for_account("Nonexistent Account")
+        assert len(roles) == 0
+    
+    def test_get_profiles_for_account_and_role(self, parsed_parser):
+        """Test getting profiles for a specific account and role."""
+        profiles = parsed_parser.get_profiles_for_account_and_role("Account 1", "AdministratorAccess")
+        assert len(profiles) == 2
+        
+        profile_names = [p.profile_name for p in profiles]
+        assert "profile1" in profile_names
+        assert "profile2" in profile_names
+        
+        profiles = parsed_parser.get_profiles_for_account_and_role("Account 2", "AdministratorAccess")
+        assert len(profiles) == 1
+        assert profiles[0].profile_name == "profile3"
\ No newline at end of file
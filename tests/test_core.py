@@ -3,11 +3,88 @@
 import tempfile
 from pathlib import Path
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
 from aws_profile_switch.core import AWSProfileSwitcher
 from aws_profile_switch.exceptions import NoSSOProfilesFoundError
-from aws_profile_switch.models import SSOProfile
+
+
+# Profiles shared by the read-only lookup tests
+LOOKUP_CONFIG = """
+[profile test-profile]
+sso_start_url = https://example.awsapps.com/start
+sso_region = us-east-1
+sso_account_id = 123456789012
+sso_role_name = AdministratorAccess
+sso_account_name = Test Account
+
+[profile profile1]
+sso_start_url = https://example.awsapps.com/start
+sso_region = us-east-1
+sso_account_id = 123456789012
+sso_role_name = AdministratorAccess
+sso_account_name = Account 1
+
+[profile profile2]
+sso_start_url = https://example.awsapps.com/start
+sso_region = us-west-2
+sso_account_id = 123456789013
+sso_role_name = ReadOnlyAccess
+sso_account_name = Account 2
+"""
+
+
+@pytest.fixture(scope="module")
+def loaded_switcher(tmp_path_factory):
+    """Load the shared lookup config once for this module."""
+    config_file = tmp_path_factory.mktemp("core") / "config"
+    config_file.write_text(LOOKUP_CONFIG)
+    switcher = AWSProfileSwitcher(config_file)
+    switcher._load_profiles()
+    return switcher
+
+
+class _StubSelector:
+    """Selector stand-in that returns preset answers and records its calls."""
+    
+    def __init__(self, account=None, role=None, profile=None):
+        """Initialize with the answers for each workflow step."""
+        self.account = account
+        self.role = role
+        self.profile = profile
+        self.calls = []
+    
+    def search_accounts_with_history(self, recent_profiles):
+        """Return the preset account."""
+        self.calls.append(("search_accounts_with_history", recent_profiles))
+        return self.account
+    
+    def search_roles(self, account_name):
+        """Return the preset role."""
+        self.calls.append(("search_roles", account_name))
+        return self.role
+    
+    def select_profile(self, account_name, role_name):
+        """Return the preset profile."""
+        self.calls.append(("select_profile", account_name, role_name))
+        return self.profile
+
+
+class _StubHistory:
+    """History stand-in that records added profiles instead of writing them."""
+    
+    def __init__(self, recent_profiles=None):
+        """Initialize with the recent profiles to report."""
+        self.recent_profiles = recent_profiles or []
+        self.added = []
+    
+    def get_recent_profiles(self):
+        """Return the preset recent profiles."""
+        return list(self.recent_profiles)
+    
+    def add_profile(self, profile_name):
+        """Record the added profile."""
+        self.added.append(profile_name)
 
 
 class TestAWSProfileSwitcher:
@@ -31,6 +108,16 @@ class TestAWSProfileSwitcher:
         assert switcher.profiles == []
         assert switcher.selector is None
     
+    def test_init_defers_history_and_shell_detection(self):
+        """Test that history and shell detection are created on first use."""
+        switcher = AWSProfileSwitcher(Path("/test/config"))
+        
+        assert "history" not in vars(switcher)
+        assert "shell_detector" not in vars(switcher)
+        
+        assert switcher.history is switcher.history
+        assert switcher.shell_detector is switcher.shell_detector
+    
     def test_init_default_config(self):
         """Test initializing with default config file."""
         switcher = AWSProfileSwitcher()
@@ -62,6 +149,35 @@ sso_account_name = Test Account
         finally:
             config_file.unlink()
     
+    def test_load_profiles_only_once(self):
+        """Test that repeated loads reuse the first parse."""
+        config_content = """
+[profile test-profile]
+sso_start_url = https://example.awsapps.com/start
+sso_region = us-east-1
+sso_account_id = 123456789012
+sso_role_name = AdministratorAccess
+sso_account_name = Test Account
+"""
+        
+        config_file = self.create_test_config(config_content)
+        switcher = AWSProfileSwitcher(config_file)
+        
+        try:
+            with patch.object(
+                switcher.config_parser, 'parse_config', wraps=switcher.config_parser.parse_config
+            ) as mock_parse:
+                switcher._load_profiles()
+                selector = switcher.selector
+                switcher._load_profiles()
+                switcher.list_profiles()
+            
+            mock_parse.assert_called_once()
+            assert switcher.selector is selector
+            
+        finally:
+            config_file.unlink()
+    
     def test_load_profiles_no_sso_profiles(self):
         """Test loading config with no SSO profiles."""
         config_content = """
@@ -81,167 +197,64 @@ region = us-east-1
         finally:
             config_file.unlink()
     
+    def create_stubbed_switcher(self, selector, recent_profiles=None) -> AWSProfileSwitcher:
+        """Create a switcher whose profiles are already loaded, using stub collaborators."""
+        switcher = AWSProfileSwitcher(Path("/test/config"))
+        switcher.history = _StubHistory(recent_profiles)
+        switcher.selector = selector
+        switcher._loaded = True  # Skip parsing; the selector is preset
+        return switcher
+    
     def test_run_with_recent_profile_selection(self):
-        """Test running with recent profile selection."""
-        config_content = """
-[profile test-profile]
-sso_start_url = https://example.awsapps.com/start
-sso_region = us-east-1
-sso_account_id = 123456789012
-sso_role_name = AdministratorAccess
-sso_account_name = Test Account
-"""
+        """Test running with recent profiles available to the account search."""
+        selector = _StubSelector("Test Account", "AdministratorAccess", "test-profile")
+        switcher = self.create_stubbed_switcher(selector, recent_profiles=["test-profile"])
         
-        config_file = self.create_test_config(config_content)
-        switcher = AWSProfileSwitcher(config_file)
+        result = switcher.run()
         
-        try:
-            with patch.object(switcher.history, 'get_recent_profiles', return_value=["test-profile"]):
-                with patch.object(switcher, '_load_profiles'):
-                    switcher.profiles = [SSOProfile(
-                        profile_name="test-profile",
-                        sso_account_name="Test Account",
-                        sso_account_id="123456789012",
-                        sso_role_name="AdministratorAccess",
-                        sso_start_url="https://example.awsapps.com/start"
-                    )]
-                    
-                    mock_selector = MagicMock()
-                    mock_selector.show_recent_profiles.return_value = "test-profile"
-                    switcher.selector = mock_selector
-                    
-                    with patch.object(switcher.history, 'add_profile') as mock_add_profile:
-                        result = switcher.run()
-                        
-                        assert result == "test-profile"
-                        mock_add_profile.assert_called_once_with("test-profile")
-                        
-        finally:
-            config_file.unlink()
+        assert result == "test-profile"
+        assert selector.calls[0] == ("search_accounts_with_history", ["test-profile"])
+        assert switcher.history.added == ["test-profile"]
     
     def test_run_full_workflow(self):
         """Test running the full workflow."""
-        config_content = """
-[profile test-profile]
-sso_start_url = https://example.awsapps.com/start
-sso_region = us-east-1
-sso_account_id = 123456789012
-sso_role_name = AdministratorAccess
-sso_account_name = Test Account
-"""
+        selector = _StubSelector("Test Account", "AdministratorAccess", "test-profile")
+        switcher = self.create_stubbed_switcher(selector)
         
-        config_file = self.create_test_config(config_content)
-        switcher = AWSProfileSwitcher(config_file)
+        result = switcher.run()
         
-        try:
-            with patch.object(switcher.history, 'get_recent_profiles', return_value=[]):
-                with patch.object(switcher, '_load_profiles'):
-                    switcher.profiles = [SSOProfile(
-                        profile_name="test-profile",
-                        sso_account_name="Test Account",
-                        sso_account_id="123456789012",
-                        sso_role_name="AdministratorAccess",
-                        sso_start_url="https://example.awsapps.com/start"
-                    )]
-                    
-                    mock_selector = MagicMock()
-                    mock_selector.show_recent_profiles.return_value = None
-                    mock_selector.search_accounts.return_value = "Test Account"
-                    mock_selector.search_roles.return_value = "AdministratorAccess"
-                    mock_selector.select_profile.return_value = "test-profile"
-                    switcher.selector = mock_selector
-                    
-                    with patch.object(switcher.history, 'add_profile') as mock_add_profile:
-                        result = switcher.run()
-                        
-                        assert result == "test-profile"
-                        mock_add_profile.assert_called_once_with("test-profile")
-                        mock_selector.search_accounts.assert_called_once()
-                        mock_selector.search_roles.assert_called_once_with("Test Account")
-                        mock_selector.select_profile.assert_called_once_with("Test Account", "AdministratorAccess")
-                        
-        finally:
-            config_file.unlink()
+        assert result == "test-profile"
+        assert selector.calls == [
+            ("search_accounts_with_history", []),
+            ("search_roles", "Test Account"),
+            ("select_profile", "Test Account", "AdministratorAccess"),
+        ]
+        assert switcher.history.added == ["test-profile"]
     
     def test_run_user_cancellation_at_account_search(self):
         """Test user cancelling at account search."""
-        config_content = """
-[profile test-profile]
-sso_start_url = https://example.awsapps.com/start
-sso_region = us-east-1
-sso_account_id = 123456789012
-sso_role_name = AdministratorAccess
-sso_account_name = Test Account
-"""
+        selector = _StubSelector(account=None)  # User cancelled
+        switcher = self.create_stubbed_switcher(selector)
         
-        config_file = self.create_test_config(config_content)
-        switcher = AWSProfileSwitcher(config_file)
+        result = switcher.run()
         
-        try:
-            with patch.object(switcher.history, 'get_recent_profiles', return_value=[]):
-                with patch.object(switcher, '_load_profiles'):
-                    switcher.profiles = [SSOProfile(
-                        profile_name="test-profile",
-                        sso_account_name="Test Account",
-                        sso_account_id="123456789012",
-                        sso_role_name="AdministratorAccess",
-                        sso_start_url="https://example.awsapps.com/start"
-                    )]
-                    
-                    mock_selector = MagicMock()
-                    mock_selector.show_recent_profiles.return_value = None
-                    mock_selector.search_accounts.return_value = None  # User cancelled
-                    switcher.selector = mock_selector
-                    
-                    result = switcher.run()
-                    
-                    assert result is None
-                    mock_selector.search_accounts.assert_called_once()
-                    mock_selector.search_roles.assert_not_called()
-                    
-        finally:
-            config_file.unlink()
+        assert result is None
+        assert selector.calls == [("search_accounts_with_history", [])]
+        assert switcher.history.added == []
     
     def test_run_user_cancellation_at_role_search(self):
         """Test user cancelling at role search."""
-        config_content = """
-[profile test-profile]
-sso_start_url = https://example.awsapps.com/start
-sso_region = us-east-1
-sso_account_id = 123456789012
-sso_role_name = AdministratorAccess
-sso_account_name = Test Account
-"""
+        selector = _StubSelector("Test Account", role=None)  # User cancelled
+        switcher = self.create_stubbed_switcher(selector)
         
-        config_file = self.create_test_config(config_content)
-        switcher = AWSProfileSwitcher(config_file)
+        result = switcher.run()
         
-        try:
-            with patch.object(switcher.history, 'get_recent_profiles', return_value=[]):
-                with patch.object(switcher, '_load_profiles'):
-                    switcher.profiles = [SSOProfile(
-                        profile_name="test-profile",
-                        sso_account_name="Test Account",
-                        sso_account_id="123456789012",
-                        sso_role_name="AdministratorAccess",
-                        sso_start_url="https://example.awsapps.com/start"
-                    )]
-                    
-                    mock_selector = MagicMock()
-                    mock_selector.show_recent_profiles.return_value = None
-                    mock_selector.search_accounts.return_value = "Test Account"
-                    mock_selector.search_roles.return_value = None  # User cancelled
-                    switcher.selector = mock_selector
-                    
-                    result = switcher.run()
-                    
-                    assert result is None
-                    mock_selector.search_accounts.assert_called_once()
-                    mock_selector.search_roles.assert_called_once_with("Test Account")
-                    mock_selector.select_profile.assert_not_called()
-                    
-        finally:
-            config_file.unlink()
+        assert result is None
+        assert selector.calls == [
+            ("search_accounts_with_history", []),
+            ("search_roles", "Test Account"),
+        ]
+        assert switcher.history.added == []
     
     def test_get_shell_command(self):
         """Test getting shell command."""
@@ -253,98 +266,40 @@ sso_account_name = Test Account
             assert command == 'export AWS_PROFILE="test-profile"'
             switcher.shell_detector.generate_export_command.assert_called_once_with("test-profile")
     
-    def test_get_profile_info_existing(self):
+    def test_get_profile_info_existing(self, loaded_switcher):
         """Test getting profile info for existing profile."""
-        config_content = """
-[profile test-profile]
-sso_start_url = https://example.awsapps.com/start
-sso_region = us-east-1
-sso_account_id = 123456789012
-sso_role_name = AdministratorAccess
-sso_account_name = Test Account
-"""
-        
-        config_file = self.create_test_config(config_content)
-        switcher = AWSProfileSwitcher(config_file)
+        profile_info = loaded_switcher.get_profile_info("test-profile")
         
-        try:
-            switcher._load_profiles()
-            
-            profile_info = switcher.get_profile_info("test-profile")
-            
-            assert profile_info is not None
-            assert profile_info["profile_name"] == "test-profile"
-            assert profile_info["sso_account_name"] == "Test Account"
-            assert profile_info["sso_account_id"] == "123456789012"
-            assert profile_info["sso_role_name"] == "AdministratorAccess"
-            
-        finally:
-            config_file.unlink()
+        assert profile_info is not None
+        assert profile_info["profile_name"] == "test-profile"
+        assert profile_info["sso_account_name"] == "Test Account"
+        assert profile_info["sso_account_id"] == "123456789012"
+        assert profile_info["sso_role_name"] == "AdministratorAccess"
     
-    def test_get_profile_info_nonexistent(self):
+    def test_get_profile_info_nonexistent(self, loaded_switcher):
         """Test getting profile info for non-existent profile."""
-        config_content = """
-[profile test-profile]
-sso_start_url = https://example.awsapps.com/start
-sso_region = us-east-1
-sso_account_id = 123456789012
-sso_role_name = AdministratorAccess
-sso_account_name = Test Account
-"""
-        
-        config_file = self.create_test_config(config_content)
-        switcher = AWSProfileSwitcher(config_file)
+        profile_info = loaded_switcher.get_profile_info("nonexistent-profile")
         
-        try:
-            switcher._load_profiles()
-            
-            profile_info = switcher.get_profile_info("nonexistent-profile")
-            
-            assert profile_info is None
-            
-        finally:
-            config_file.unlink()
+        assert profile_info is None
     
-    def test_list_profiles(self):
+    def test_list_profiles(self, loaded_switcher):
         """Test listing all profiles."""
-        config_content = """
-[profile profile1]
-sso_start_url = https://example.awsapps.com/start
-sso_region = us-east-1
-sso_account_id = 123456789012
-sso_role_name = AdministratorAccess
-sso_account_name = Account 1
-
-[profile profile2]
-sso_start_url = https://example.awsapps.com/start
-sso_region = us-west-2
-sso_account_id = 123456789013
-sso_role_name = ReadOnlyAccess
-sso_account_name = Account 2
-"""
+        profiles = loaded_switcher.list_profiles()
         
-        config_file = self.create_test_config(config_content)
-        switcher = AWSProfileSwitcher(config_file)
+        assert len(profiles) == 3
         
-        try:
-            profiles = switcher.list_profiles()
-            
-            assert len(profiles) == 2
-            
-            profile_names = [p["profile_name"] for p in profiles]
-            assert "profile1" in profile_names
-            assert "profile2" in profile_names
-            
-            # Check the structure of the returned data
-            for profile in profiles:
-                assert "profile_name" in profile
-                assert "account_name" in profile
-                assert "account_id" in profile
-                assert "role_name" in profile
-                assert "display_name" in profile
-                
-        finally:
-            config_file.unlink()
+        profile_names = [p["profile_name"] for p in profiles]
+        assert "test-profile" in profile_names
+        assert "profile1" in profile_names
+        assert "profile2" in profile_names
+        
+        # Check the structure of the returned data
+        for profile in profiles:
+            assert "profile_name" in profile
+            assert "account_name" in profile
+            assert "account_id" in profile
+            assert "role_name" in profile
+            assert "display_name" in profile
     
     def test_list_profiles_empty(self):
         """Test listing profiles when none exist."""
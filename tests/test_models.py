@@ -1,11 +1,12 @@
 """Tests for AWS Profile Switch models."""
 
-import json
-import tempfile
-from pathlib import Path
+import dataclasses
+import os
+import sys
 import pytest
+from unittest.mock import patch
 
-from aws_profile_switch.models import SSOProfile, ProfileHistory
+from aws_profile_switch.models import SSOProfile, ProfileHistory, group_roles_by_account
 
 
 class TestSSOProfile:
@@ -52,6 +53,34 @@ class TestSSOProfile:
                 sso_start_url="https://example.awsapps.com/start"
             )
     
+    @pytest.mark.skipif(sys.version_info < (3, 10), reason="slotted dataclasses need Python 3.10+")
+    def test_sso_profile_uses_slots(self):
+        """Test that profiles are slotted and carry no instance __dict__."""
+        profile = SSOProfile(
+            profile_name="test-profile",
+            sso_account_name="Test Account",
+            sso_account_id="123456789012",
+            sso_role_name="AdministratorAccess",
+            sso_start_url="https://example.awsapps.com/start"
+        )
+        
+        assert not hasattr(profile, "__dict__")
+    
+    def test_sso_profile_is_frozen_and_hashable(self):
+        """Test that profiles cannot be modified and can be used in sets."""
+        data = dict(
+            profile_name="test-profile",
+            sso_account_name="Test Account",
+            sso_account_id="123456789012",
+            sso_role_name="AdministratorAccess",
+            sso_start_url="https://example.awsapps.com/start"
+        )
+        profile = SSOProfile(**data)
+        
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            profile.sso_role_name = "ReadOnlyAccess"
+        assert {profile, SSOProfile(**data)} == {profile}
+    
     def test_display_name(self):
         """Test the display name property."""
         profile = SSOProfile(
@@ -107,117 +136,199 @@ class TestSSOProfile:
         assert profile.sso_region == "us-west-2"
 
 
+class TestGroupRolesByAccount:
+    """Tests for group_roles_by_account."""
+    
+    def test_accounts_and_roles_are_sorted_and_unique(self):
+        """Test that accounts and their roles come out sorted, without duplicates."""
+        profiles = [
+            SSOProfile(name, account, "123456789012", role, "https://example.awsapps.com/start")
+            for name, account, role in [
+                ("p1", "Zeta Account", "ReadOnlyAccess"),
+                ("p2", "Alpha Account", "ReadOnlyAccess"),
+                ("p3", "Zeta Account", "AdministratorAccess"),
+                ("p4", "Zeta Account", "ReadOnlyAccess"),
+            ]
+        ]
+        
+        roles = group_roles_by_account(profiles)
+        
+        assert list(roles) == ["Alpha Account", "Zeta Account"]
+        assert roles["Zeta Account"] == ("AdministratorAccess", "ReadOnlyAccess")
+        assert roles["Alpha Account"] == ("ReadOnlyAccess",)
+
+
 class TestProfileHistory:
     """Tests for ProfileHistory class."""
     
-    def test_profile_history_init(self):
+    def test_profile_history_init(self, tmp_path):
         """Test initializing profile history."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            history_file = Path(temp_dir) / "history.json"
-            history = ProfileHistory(history_file)
-            
-            assert history.history_file == history_file
-            assert history.get_recent_profiles() == []
+        history_file = tmp_path / "history.json"
+        history = ProfileHistory(history_file)
+        
+        assert history.history_file == history_file
+        assert history.get_recent_profiles() == []
+    
+    def test_in_memory_history_skips_disk(self, tmp_path):
+        """Test that in-memory history neither reads nor writes its file."""
+        history_file = tmp_path / "history.json"
+        history_file.write_text('{"recent_profiles":["on-disk"]}')
+        
+        history = ProfileHistory(history_file, in_memory=True)
+        assert history.get_recent_profiles() == []
+        
+        history.add_profile("profile1")
+        assert history.get_recent_profiles() == ["profile1"]
+        assert history_file.read_text() == '{"recent_profiles":["on-disk"]}'
     
     def test_add_profile(self):
         """Test adding a profile to history."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            history_file = Path(temp_dir) / "history.json"
-            history = ProfileHistory(history_file)
-            
-            history.add_profile("profile1")
-            history.add_profile("profile2")
-            
-            recent = history.get_recent_profiles()
-            assert recent == ["profile2", "profile1"]
+        history = ProfileHistory(in_memory=True)
+        
+        history.add_profile("profile1")
+        history.add_profile("profile2")
+        
+        recent = history.get_recent_profiles()
+        assert recent == ["profile2", "profile1"]
     
     def test_add_duplicate_profile(self):
         """Test adding a duplicate profile moves it to front."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            history_file = Path(temp_dir) / "history.json"
-            history = ProfileHistory(history_file)
-            
-            history.add_profile("profile1")
-            history.add_profile("profile2")
-            history.add_profile("profile1")  # Duplicate
-            
-            recent = history.get_recent_profiles()
-            assert recent == ["profile1", "profile2"]
+        history = ProfileHistory(in_memory=True)
+        
+        history.add_profile("profile1")
+        history.add_profile("profile2")
+        history.add_profile("profile1")  # Duplicate
+        
+        recent = history.get_recent_profiles()
+        assert recent == ["profile1", "profile2"]
     
-    def test_history_limit(self):
+    def test_history_limit(self, tmp_path):
         """Test that history is limited to 10 profiles."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            history_file = Path(temp_dir) / "history.json"
-            history = ProfileHistory(history_file)
-            
-            # Add 15 profiles
-            for i in range(15):
-                history.add_profile(f"profile{i}")
-            
-            recent = history.get_recent_profiles(limit=20)
-            assert len(recent) == 10
-            assert recent[0] == "profile14"  # Most recent
-            assert recent[-1] == "profile5"  # Oldest kept
+        history_file = tmp_path / "history.json"
+        
+        # Add 15 profiles in one batch, written once on exit
+        with patch("aws_profile_switch.models.os.replace", wraps=os.replace) as mock_replace:
+            with ProfileHistory(history_file) as history:
+                for i in range(15):
+                    history.add_profile(f"profile{i}")
+                assert not history_file.exists()
+        mock_replace.assert_called_once()
+        
+        recent = history.get_recent_profiles(limit=20)
+        assert len(recent) == 10
+        assert recent[0] == "profile14"  # Most recent
+        assert recent[-1] == "profile5"  # Oldest kept
+        assert ProfileHistory(history_file).get_recent_profiles(limit=20) == recent
+    
+    def test_flush_writes_deferred_changes(self, tmp_path):
+        """Test that flush() writes changes made with flush_on_add off."""
+        history_file = tmp_path / "history.json"
+        history = ProfileHistory(history_file, flush_on_add=False)
+        
+        history.add_profile("profile1")
+        assert not history_file.exists()
+        
+        history.flush()
+        assert ProfileHistory(history_file).get_recent_profiles() == ["profile1"]
     
     def test_get_recent_profiles_limit(self):
         """Test limiting the number of recent profiles returned."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            history_file = Path(temp_dir) / "history.json"
-            history = ProfileHistory(history_file)
-            
-            for i in range(10):
-                history.add_profile(f"profile{i}")
-            
-            recent = history.get_recent_profiles(limit=3)
-            assert len(recent) == 3
-            assert recent == ["profile9", "profile8", "profile7"]
+        history = ProfileHistory(in_memory=True)
+        
+        for i in range(10):
+            history.add_profile(f"profile{i}")
+        
+        recent = history.get_recent_profiles(limit=3)
+        assert len(recent) == 3
+        assert recent == ["profile9", "profile8", "profile7"]
     
     def test_clear_history(self):
         """Test clearing all history."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            history_file = Path(temp_dir) / "history.json"
-            history = ProfileHistory(history_file)
-            
-            history.add_profile("profile1")
-            history.add_profile("profile2")
-            
-            assert len(history.get_recent_profiles()) == 2
-            
-            history.clear()
-            assert history.get_recent_profiles() == []
-    
-    def test_persistence(self):
+        history = ProfileHistory(in_memory=True)
+        
+        history.add_profile("profile1")
+        history.add_profile("profile2")
+        
+        assert len(history.get_recent_profiles()) == 2
+        
+        history.clear()
+        assert history.get_recent_profiles() == []
+    
+    def test_persistence(self, tmp_path):
         """Test that history is persisted to disk."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            history_file = Path(temp_dir) / "history.json"
-            
-            # Create history and add profiles
-            history1 = ProfileHistory(history_file)
-            history1.add_profile("profile1")
-            history1.add_profile("profile2")
-            
-            # Create new history instance and verify profiles are loaded
-            history2 = ProfileHistory(history_file)
-            recent = history2.get_recent_profiles()
-            assert recent == ["profile2", "profile1"]
-    
-    def test_load_corrupted_history(self):
+        history_file = tmp_path / "history.json"
+        
+        # Create history and add profiles
+        history1 = ProfileHistory(history_file)
+        history1.add_profile("profile1")
+        history1.add_profile("profile2")
+        
+        # Create new history instance and verify profiles are loaded
+        history2 = ProfileHistory(history_file)
+        recent = history2.get_recent_profiles()
+        assert recent == ["profile2", "profile1"]
+    
+    def test_save_is_compact_and_atomic(self, tmp_path):
+        """Test that history is written as compact JSON without leftover temp files."""
+        history_file = tmp_path / "history.json"
+        
+        history = ProfileHistory(history_file)
+        history.add_profile("profile1")
+        
+        assert history_file.read_text() == '{"recent_profiles":["profile1"]}'
+        assert list(tmp_path.iterdir()) == [history_file]
+    
+    def test_failed_save_leaves_no_temp_file(self, tmp_path):
+        """Test that a history write that cannot be swapped in is cleaned up."""
+        history = ProfileHistory(tmp_path / "history.json")
+        
+        with patch("aws_profile_switch.models.os.replace", side_effect=OSError):
+            history.add_profile("profile1")
+        
+        assert history.get_recent_profiles() == ["profile1"]
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_unchanged_history_is_not_rewritten(self, tmp_path):
+        """Test that re-adding the most recent profile skips the file write."""
+        history_file = tmp_path / "history.json"
+        
+        history = ProfileHistory(history_file)
+        history.add_profile("profile1")
+        
+        with patch("aws_profile_switch.models.os.replace") as mock_replace:
+            history.add_profile("profile1")
+            ProfileHistory(history_file).add_profile("profile1")
+        mock_replace.assert_not_called()
+        
+        # Moving the history to another file still writes it there
+        other_file = tmp_path / "other.json"
+        history.history_file = other_file
+        history.add_profile("profile1")
+        assert other_file.read_text() == '{"recent_profiles":["profile1"]}'
+    
+    def test_load_corrupted_history(self, tmp_path):
         """Test loading corrupted history file."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            history_file = Path(temp_dir) / "history.json"
-            
-            # Create corrupted JSON file
-            with open(history_file, 'w') as f:
-                f.write("invalid json")
-            
-            # Should handle corrupted file gracefully
-            history = ProfileHistory(history_file)
-            assert history.get_recent_profiles() == []
-    
-    def test_load_missing_history(self):
+        history_file = tmp_path / "history.json"
+        
+        # Create corrupted JSON file
+        with open(history_file, 'w') as f:
+            f.write("invalid json")
+        
+        # Should handle corrupted file gracefully
+        history = ProfileHistory(history_file)
+        assert history.get_recent_profiles() == []
+    
+    def test_load_undecodable_history(self, tmp_path):
+        """Test loading a history file that is not valid UTF-8."""
+        history_file = tmp_path / "history.json"
+        history_file.write_bytes(b'{"recent_profiles":["\xff"]}')
+        
+        history = ProfileHistory(history_file)
+        assert history.get_recent_profiles() == []
+    
+    def test_load_missing_history(self, tmp_path):
         """Test loading from non-existent history file."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            history_file = Path(temp_dir) / "nonexistent.json"
-            history = ProfileHistory(history_file)
-            
-            assert history.get_recent_profiles() == []
\ No newline at end of file
+        history_file = tmp_path / "nonexistent.json"
+        history = ProfileHistory(history_file)
+        
+        assert history.get_recent_profiles() == []
\ No newline at end of file
@@ -1,140 +1,117 @@
 """Tests for fuzzy search functionality."""
 
 import pytest
+from unittest.mock import patch
 
 from aws_profile_switch.search import FuzzySearcher
 from aws_profile_switch.models import SSOProfile
 
 
+# Profiles shared by every search test
+_PROFILES = [
+    SSOProfile(
+        profile_name="dev-admin",
+        sso_account_name="Development Account",
+        sso_account_id="123456789012",
+        sso_role_name="AdministratorAccess",
+        sso_start_url="https://example.awsapps.com/start"
+    ),
+    SSOProfile(
+        profile_name="dev-readonly",
+        sso_account_name="Development Account",
+        sso_account_id="123456789012",
+        sso_role_name="ReadOnlyAccess",
+        sso_start_url="https://example.awsapps.com/start"
+    ),
+    SSOProfile(
+        profile_name="prod-admin",
+        sso_account_name="Production Account",
+        sso_account_id="123456789013",
+        sso_role_name="AdministratorAccess",
+        sso_start_url="https://example.awsapps.com/start"
+    ),
+    SSOProfile(
+        profile_name="staging-readonly",
+        sso_account_name="Staging Environment",
+        sso_account_id="123456789014",
+        sso_role_name="ReadOnlyAccess",
+        sso_start_url="https://example.awsapps.com/start"
+    ),
+    SSOProfile(
+        profile_name="test-developer",
+        sso_account_name="Test Account",
+        sso_account_id="123456789015",
+        sso_role_name="DeveloperAccess",
+        sso_start_url="https://example.awsapps.com/start"
+    ),
+]
+
+
+@pytest.fixture(scope="module")
+def searcher():
+    """Searcher over the shared profiles, built once for this module."""
+    return FuzzySearcher(_PROFILES)
+
+
 class TestFuzzySearcher:
     """Tests for FuzzySearcher class."""
     
-    def create_test_profiles(self):
-        """Create test profiles for search testing."""
-        return [
-            SSOProfile(
-                profile_name="dev-admin",
-                sso_account_name="Development Account",
-                sso_account_id="123456789012",
-                sso_role_name="AdministratorAccess",
-                sso_start_url="https://example.awsapps.com/start"
-            ),
-            SSOProfile(
-                profile_name="dev-readonly",
-                sso_account_name="Development Account",
-                sso_account_id="123456789012",
-                sso_role_name="ReadOnlyAccess",
-                sso_start_url="https://example.awsapps.com/start"
-            ),
-            SSOProfile(
-                profile_name="prod-admin",
-                sso_account_name="Production Account",
-                sso_account_id="123456789013",
-                sso_role_name="AdministratorAccess",
-                sso_start_url="https://example.awsapps.com/start"
-            ),
-            SSOProfile(
-                profile_name="staging-readonly",
-                sso_account_name="Staging Environment",
-                sso_account_id="123456789014",
-                sso_role_name="ReadOnlyAccess",
-                sso_start_url="https://example.awsapps.com/start"
-            ),
-            SSOProfile(
-                profile_name="test-developer",
-                sso_account_name="Test Account",
-                sso_account_id="123456789015",
-                sso_role_name="DeveloperAccess",
-                sso_start_url="https://example.awsapps.com/start"
-            ),
-        ]
-    
-    def test_search_accounts_exact_match(self):
-        """Test searching for accounts with exact match."""
-        profiles = self.create_test_profiles()
-        searcher = FuzzySearcher(profiles)
-        
-        results = searcher.search_accounts("Development Account")
-        assert len(results) > 0
-        assert "Development Account" in results
-    
-    def test_search_accounts_partial_match(self):
-        """Test searching for accounts with partial match."""
-        profiles = self.create_test_profiles()
-        searcher = FuzzySearcher(profiles)
-        
-        results = searcher.search_accounts("Dev")
-        assert len(results) > 0
-        assert "Development Account" in results
-    
-    def test_search_accounts_fuzzy_match(self):
-        """Test searching for accounts with fuzzy match."""
-        profiles = self.create_test_profiles()
-        searcher = FuzzySearcher(profiles)
-        
-        results = searcher.search_accounts("Developmnt")  # Missing 'e'
-        assert len(results) > 0
+    @pytest.mark.parametrize("query", [
+        "Development Account",
+        "Dev",
+        "Developmnt",  # Missing 'e'
+    ], ids=["exact_match", "partial_match", "fuzzy_match"])
+    def test_search_accounts_matches(self, searcher, query):
+        """Test searching for accounts with exact, partial and fuzzy queries."""
+        results = searcher.search_accounts(query)
         assert "Development Account" in results
     
-    def test_search_accounts_empty_query(self):
+    def test_search_accounts_empty_query(self, searcher):
         """Test searching for accounts with empty query."""
-        profiles = self.create_test_profiles()
-        searcher = FuzzySearcher(profiles)
-        
         results = searcher.search_accounts("")
         assert len(results) == 0
         
         results = searcher.search_accounts("   ")
         assert len(results) == 0
     
-    def test_search_accounts_no_matches(self):
+    def test_search_accounts_no_matches(self, searcher):
         """Test searching for accounts with no matches."""
-        profiles = self.create_test_profiles()
-        searcher = FuzzySearcher(profiles)
-        
         results = searcher.search_accounts("NonexistentAccount")
         assert len(results) == 0
     
-    def test_search_accounts_limit(self):
+    def test_search_accounts_limit(self, searcher):
         """Test limiting search results."""
-        profiles = self.create_test_profiles()
-        searcher = FuzzySearcher(profiles)
-        
         results = searcher.search_accounts("Account", limit=2)
         assert len(results) <= 2
     
-    def test_search_roles_exact_match(self):
-        """Test searching for roles with exact match."""
-        profiles = self.create_test_profiles()
-        searcher = FuzzySearcher(profiles)
-        
-        results = searcher.search_roles("AdministratorAccess", "Development Account")
-        assert len(results) > 0
-        assert "AdministratorAccess" in results
-    
-    def test_search_roles_partial_match(self):
-        """Test searching for roles with partial match."""
-        profiles = self.create_test_profiles()
-        searcher = FuzzySearcher(profiles)
-        
-        results = searcher.search_roles("Admin", "Development Account")
-        assert len(results) > 0
-        assert "AdministratorAccess" in results
-    
-    def test_search_roles_fuzzy_match(self):
-        """Test searching for roles with fuzzy match."""
-        profiles = self.create_test_profiles()
-        searcher = FuzzySearcher(profiles)
-        
-        results = searcher.search_roles("Readonly", "Development Account")
-        assert len(results) > 0
-        assert "ReadOnlyAccess" in results
-    
-    def test_search_roles_account_specific(self):
+    def test_search_accounts_short_query_substring_only(self, searcher):
+        """Test that very short queries only return substring matches."""
+        results = searcher.search_accounts("ac")
+        assert sorted(results) == ["Development Account", "Production Account", "Test Account"]
+    
+    def test_search_accounts_order_ignores_profile_order(self, searcher):
+        """Test that substring hits come back in sorted order however the profiles are ordered."""
+        expected = ["Development Account", "Production Account", "Test Account"]
+        assert searcher.search_accounts("ac") == expected
+        assert FuzzySearcher(list(reversed(_PROFILES))).search_accounts("ac") == expected
+    
+    def test_search_accounts_substring_matches_first(self, searcher):
+        """Test that substring matches are ranked ahead of fuzzy matches."""
+        results = searcher.search_accounts("staging")
+        assert results[0] == "Staging Environment"
+    
+    @pytest.mark.parametrize("query,expected", [
+        ("AdministratorAccess", "AdministratorAccess"),
+        ("Admin", "AdministratorAccess"),
+        ("Readonly", "ReadOnlyAccess"),
+    ], ids=["exact_match", "partial_match", "fuzzy_match"])
+    def test_search_roles_matches(self, searcher, query, expected):
+        """Test searching for roles with exact, partial and fuzzy queries."""
+        results = searcher.search_roles(query, "Development Account")
+        assert expected in results
+    
+    def test_search_roles_account_specific(self, searcher):
         """Test that role search is account-specific."""
-        profiles = self.create_test_profiles()
-        searcher = FuzzySearcher(profiles)
-        
         # Development Account has both Administrator and ReadOnly roles
         results = searcher.search_roles("Access", "Development Account")
         assert len(results) == 2
@@ -146,109 +123,110 @@ class TestFuzzySearcher:
         assert len(results) == 1
         assert "DeveloperAccess" in results
     
-    def test_search_roles_empty_query(self):
+    def test_search_roles_empty_query(self, searcher):
         """Test searching for roles with empty query."""
-        profiles = self.create_test_profiles()
-        searcher = FuzzySearcher(profiles)
-        
         results = searcher.search_roles("", "Development Account")
         assert len(results) == 0
     
-    def test_search_roles_nonexistent_account(self):
+    def test_search_roles_nonexistent_account(self, searcher):
         """Test searching for roles in a nonexistent account."""
-        profiles = self.create_test_profiles()
-        searcher = FuzzySearcher(profiles)
-        
         results = searcher.search_roles("Admin", "Nonexistent Account")
         assert len(results) == 0
     
-    def test_search_profiles_exact_match(self):
-        """Test searching for profiles with exact match."""
-        profiles = self.create_test_profiles()
-        searcher = FuzzySearcher(profiles)
-        
-        results = searcher.search_profiles("dev-admin")
-        assert len(results) > 0
-        assert any(p.profile_name == "dev-admin" for p in results)
-    
-    def test_search_profiles_account_match(self):
-        """Test searching for profiles by account name."""
-        profiles = self.create_test_profiles()
-        searcher = FuzzySearcher(profiles)
-        
-        results = searcher.search_profiles("Development")
-        assert len(results) >= 2  # dev-admin and dev-readonly
-        
-        profile_names = [p.profile_name for p in results]
-        assert "dev-admin" in profile_names
-        assert "dev-readonly" in profile_names
-    
-    def test_search_profiles_role_match(self):
-        """Test searching for profiles by role name."""
-        profiles = self.create_test_profiles()
-        searcher = FuzzySearcher(profiles)
-        
-        results = searcher.search_profiles("Administrator")
-        assert len(results) >= 2  # dev-admin and prod-admin
-        
-        profile_names = [p.profile_name for p in results]
-        assert "dev-admin" in profile_names
-        assert "prod-admin" in profile_names
-    
-    def test_search_profiles_empty_query(self):
+    def test_search_with_prebuilt_indexes(self):
+        """Test account and role search using name indexes supplied by the caller."""
+        searcher = FuzzySearcher(
+            _PROFILES,
+            account_names=("Development Account", "Test Account"),
+            roles_by_account={
+                "Development Account": ("AdministratorAccess", "ReadOnlyAccess"),
+                "Test Account": ("DeveloperAccess",),
+            },
+        )
+        
+        assert "Production Account" not in searcher.search_accounts("Account")
+        results = searcher.search_roles("Access", "Development Account")
+        assert sorted(results) == ["AdministratorAccess", "ReadOnlyAccess"]
+    
+    @pytest.mark.parametrize("query,expected", [
+        ("dev-admin", ["dev-admin"]),
+        ("Development", ["dev-admin", "dev-readonly"]),
+        ("Administrator", ["dev-admin", "prod-admin"]),
+    ], ids=["exact_match", "account_match", "role_match"])
+    def test_search_profiles_matches(self, searcher, query, expected):
+        """Test searching for profiles by profile, account and role name."""
+        profile_names = [p.profile_name for p in searcher.search_profiles(query)]
+        for name in expected:
+            assert name in profile_names
+    
+    def test_search_profiles_empty_query(self, searcher):
         """Test searching for profiles with empty query."""
-        profiles = self.create_test_profiles()
-        searcher = FuzzySearcher(profiles)
-        
         results = searcher.search_profiles("")
         assert len(results) == 0
     
-    def test_search_profiles_limit(self):
+    def test_search_profiles_limit(self, searcher):
         """Test limiting profile search results."""
-        profiles = self.create_test_profiles()
-        searcher = FuzzySearcher(profiles)
-        
         results = searcher.search_profiles("Account", limit=2)
         assert len(results) <= 2
     
-    def test_get_best_match_exact(self):
-        """Test getting the best match with exact match."""
-        profiles = self.create_test_profiles()
-        searcher = FuzzySearcher(profiles)
+    def test_repeated_searches_are_cached(self):
+        """Test that repeating a search returns a fresh copy of the cached result."""
+        # A fresh searcher so the first search is not already cached
+        searcher = FuzzySearcher(_PROFILES)
         
+        first = searcher.search_accounts("Developmnt")
+        first.append("mutated")
+        
+        with patch("aws_profile_switch.search.process.extract", side_effect=AssertionError):
+            assert searcher.search_accounts("Developmnt") == first[:-1]
+        assert searcher.search_accounts("Developmnt", limit=1) == ["Development Account"]
+    
+    def test_get_matches_ranked(self, searcher):
+        """Test getting ranked matches with their scores."""
+        candidates = ["Development Account", "Production Account", "Test Account"]
+        matches = searcher.get_matches("Production", candidates, limit=2)
+        
+        assert len(matches) == 2
+        assert matches[0][0] == "Production Account"
+        assert matches[0][1] >= matches[1][1]
+        assert searcher.get_matches("", candidates) == []
+        assert searcher.get_matches("Production", []) == []
+    
+    def test_get_best_match_exact(self, searcher):
+        """Test getting the best match with exact match."""
         candidates = ["Development Account", "Production Account", "Test Account"]
         match, score = searcher.get_best_match("Development Account", candidates)
         
         assert match == "Development Account"
         assert score == 100  # Perfect match
     
-    def test_get_best_match_partial(self):
-        """Test getting the best match with partial match."""
-        profiles = self.create_test_profiles()
-        searcher = FuzzySearcher(profiles)
+    def test_get_best_match_exact_skips_scorer(self, searcher):
+        """Test that a case-insensitive exact match is returned without scoring."""
+        candidates = ["Development Account", "Production Account", "Test Account"]
+        with patch("aws_profile_switch.search.process.extractOne", side_effect=AssertionError):
+            match, score = searcher.get_best_match("production account", candidates)
         
+        assert match == "Production Account"
+        assert score == 100
+    
+    def test_get_best_match_partial(self, searcher):
+        """Test getting the best match with partial match."""
         candidates = ["Development Account", "Production Account", "Test Account"]
         match, score = searcher.get_best_match("Dev", candidates)
         
         assert match == "Development Account"
         assert score > 30  # Should have decent score
     
-    def test_get_best_match_empty_query(self):
+    def test_get_best_match_empty_query(self, searcher):
         """Test getting the best match with empty query."""
-        profiles = self.create_test_profiles()
-        searcher = FuzzySearcher(profiles)
-        
         candidates = ["Development Account", "Production Account"]
         match, score = searcher.get_best_match("", candidates)
         
         assert match == ""
         assert score == 0
     
-    def test_get_best_match_empty_candidates(self):
+    def test_get_best_match_empty_candidates(self, searcher):
         """Test getting the best match with empty candidates."""
-        profiles = self.create_test_profiles()
-        searcher = FuzzySearcher(profiles)
-        
         match, score = searcher.get_best_match("Development", [])
         
         assert match == ""
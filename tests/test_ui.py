@@ -0,0 +1,210 @@
+"""Tests for user interface components."""
+
+from unittest.mock import patch
+
+import pytest
+from prompt_toolkit.document import Document
+
+from aws_profile_switch.ui import ProfileCompleter, ProfileSelector, _parse_choice
+from aws_profile_switch.models import SSOProfile
+
+
+class TestProfileSelector:
+    """Tests for ProfileSelector class."""
+    
+    def create_test_profiles(self):
+        """Create test profiles for selector testing."""
+        return [
+            SSOProfile(
+                profile_name="dev-admin",
+                sso_account_name="Development Account",
+                sso_account_id="123456789012",
+                sso_role_name="AdministratorAccess",
+                sso_start_url="https://example.awsapps.com/start"
+            ),
+            SSOProfile(
+                profile_name="dev-readonly",
+                sso_account_name="Development Account",
+                sso_account_id="123456789012",
+                sso_role_name="ReadOnlyAccess",
+                sso_start_url="https://example.awsapps.com/start"
+            ),
+            SSOProfile(
+                profile_name="prod-admin",
+                sso_account_name="Production Account",
+                sso_account_id="123456789013",
+                sso_role_name="AdministratorAccess",
+                sso_start_url="https://example.awsapps.com/start"
+            ),
+            SSOProfile(
+                profile_name="staging-readonly",
+                sso_account_name="Staging Environment",
+                sso_account_id="123456789014",
+                sso_role_name="ReadOnlyAccess",
+                sso_start_url="https://example.awsapps.com/start"
+            ),
+        ]
+    
+    def test_reuses_given_indexes(self):
+        """Test that prebuilt indexes are used as given instead of rebuilt."""
+        profiles = self.create_test_profiles()
+        by_account_role = {("Production Account", "AdministratorAccess"): [profiles[2]]}
+        
+        selector = ProfileSelector(
+            profiles,
+            account_names=("Production Account",),
+            roles_by_account={"Production Account": ("AdministratorAccess",)},
+            profiles_by_account_role=by_account_role,
+        )
+        
+        assert selector._by_account_role is by_account_role
+        assert selector._all_accounts_sorted == ["Production Account"]
+        assert selector.select_profile("Production Account", "AdministratorAccess") == "prod-admin"
+    
+    def test_account_completions_exact_match(self):
+        """Test that an exact account name is returned on its own."""
+        selector = ProfileSelector(self.create_test_profiles())
+        
+        assert selector._account_completions("Production Account") == ["Production Account"]
+    
+    def test_account_completions_prefix_before_substring(self):
+        """Test that prefix matches are returned before substring matches."""
+        selector = ProfileSelector(self.create_test_profiles())
+        
+        assert selector._account_completions("dev") == ["Development Account"]
+        assert selector._account_completions("account") == [
+            "Development Account",
+            "Production Account",
+        ]
+    
+    def test_account_completions_casefold(self):
+        """Test that completion matching folds Unicode case variants."""
+        profiles = self.create_test_profiles()
+        profiles.append(SSOProfile(
+            profile_name="strasse-admin",
+            sso_account_name="Straße Account",
+            sso_account_id="123456789019",
+            sso_role_name="AdministratorAccess",
+            sso_start_url="https://example.awsapps.com/start"
+        ))
+        selector = ProfileSelector(profiles)
+        
+        assert selector._account_completions("STRASSE") == ["Straße Account"]
+    
+    def test_account_completions_short_query(self):
+        """Test that one-character queries produce no completions."""
+        selector = ProfileSelector(self.create_test_profiles())
+        
+        assert selector._account_completions("") == []
+        assert selector._account_completions("d") == []
+    
+    def test_account_completions_fuzzy_fallback(self):
+        """Test that misspelt queries fall back to fuzzy matching."""
+        selector = ProfileSelector(self.create_test_profiles())
+        
+        results = selector._account_completions("prodction")
+        
+        assert results[0] == "Production Account"
+    
+    def test_single_account_skips_prompt(self):
+        """Test that a lone account and role are returned without prompting."""
+        profiles = self.create_test_profiles()[:2]
+        selector = ProfileSelector(profiles)
+        
+        with patch('aws_profile_switch.ui.prompt') as mock_prompt:
+            assert selector.search_accounts() == "Development Account"
+            assert selector.search_accounts_with_history(["dev-admin"]) == "Development Account"
+            mock_prompt.assert_not_called()
+        
+        single_role = ProfileSelector(self.create_test_profiles()[2:])
+        with patch('aws_profile_switch.ui.prompt') as mock_prompt:
+            assert single_role.search_roles("Production Account") == "AdministratorAccess"
+            mock_prompt.assert_not_called()
+    
+    def test_select_profile_single_match(self):
+        """Test selecting the profile for an account and role."""
+        selector = ProfileSelector(self.create_test_profiles())
+        
+        assert selector.select_profile("Development Account", "ReadOnlyAccess") == "dev-readonly"
+        assert selector.select_profile("Development Account", "DeveloperAccess") is None
+    
+    def test_select_profile_multiple_matches(self, capsys):
+        """Test choosing between profiles that share an account and role."""
+        profiles = self.create_test_profiles()
+        profiles.append(SSOProfile(
+            profile_name="dev-admin-2",
+            sso_account_name="Development Account",
+            sso_account_id="123456789012",
+            sso_role_name="AdministratorAccess",
+            sso_start_url="https://example.awsapps.com/start"
+        ))
+        selector = ProfileSelector(profiles)
+        
+        with patch('aws_profile_switch.ui.prompt', return_value="2"):
+            result = selector.select_profile("Development Account", "AdministratorAccess")
+        
+        assert result == "dev-admin-2"
+        assert capsys.readouterr().out == (
+            "Multiple profiles found for Development Account - AdministratorAccess:\n"
+            "  1. dev-admin (Account ID: 123456789012)\n"
+            "  2. dev-admin-2 (Account ID: 123456789012)\n"
+        )
+    
+    def test_inline_selector_shares_searcher(self):
+        """Test that the inline selector reuses the outer searcher."""
+        selector = ProfileSelector(self.create_test_profiles())
+        
+        assert selector.inline_selector.searcher is selector.searcher
+
+
+class TestParseChoice:
+    """Tests for numeric choice parsing."""
+    
+    @pytest.mark.parametrize("choice,expected", [
+        ("1", 0),
+        ("3", 2),
+        ("0", None),
+        ("4", None),
+        ("-1", None),
+        ("abc", None),
+        ("", None),
+        (" 2 ", None),
+        ("+2", None),
+        ("1_0", None),
+        ("\u00b2", None),
+    ])
+    def test_parse_choice(self, choice, expected):
+        """Test converting a 1-based choice into an index."""
+        assert _parse_choice(choice, 3) == expected
+
+
+class TestProfileCompleter:
+    """Tests for ProfileCompleter class."""
+    
+    def test_completions_replace_word_and_skip_empty(self):
+        """Test that completions replace the typed word and skip empty entries."""
+        completer = ProfileCompleter(lambda word: ["Development", "", "Dev"])
+        
+        completions = list(completer.get_completions(Document("dev"), None))
+        
+        assert [c.text for c in completions] == ["Development", "Dev"]
+        assert all(c.start_position == -3 for c in completions)
+    
+    def test_completions_are_cached_per_word(self):
+        """Test that repeated words reuse the cached completions."""
+        calls = []
+        
+        def get_completions(word):
+            calls.append(word)
+            return [word.upper()]
+        
+        completer = ProfileCompleter(get_completions)
+        list(completer.get_completions(Document("dev"), None))
+        list(completer.get_completions(Document("dev"), None))
+        
+        assert calls == ["dev"]
+        
+        completer.clear_cache()
+        list(completer.get_completions(Document("dev"), None))
+        
+        assert calls == ["dev", "dev"]
\ No newline at end of file